@@ -1,45 +1,154 @@
+import asyncio
+import atexit
 import logging
 import logging.config
-from fastapi import FastAPI, Query, HTTPException
+import logging.handlers
+import os
+import queue
+import select
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+import orjson
+from fastapi import Depends, FastAPI, Query, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.orchestration.tasks import aggregate_social, healthcheck
+from fastapi.responses import ORJSONResponse
+from app.orchestration.tasks import _parse_window, aggregate_social_async, healthcheck
 from app.config import get_settings
+from app.nlp.embeddings import _get_embedding_model
+from app.nlp.sentiment import _get_finbert_model
+from app.storage.db import get_pool
+
+# Records are queued by the request path and written by a listener thread,
+# so handlers never block the event loop on console I/O
+_log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+# Console output is batched and flushed on this interval instead of per record.
+# Each flush is one write(2) of whole records no larger than PIPE_BUF, which is atomic
+# on a pipe, so lines from several workers sharing stderr never split or interleave
+LOG_BUFFER_SIZE = getattr(select, "PIPE_BUF", 512)
+LOG_FLUSH_INTERVAL = 1.0
+
+class _BufferedFdHandler(logging.Handler):
+    """Handler that batches whole records and writes them to a file descriptor.
+
+    A record that would overflow the batch flushes it first; a record larger than
+    LOG_BUFFER_SIZE on its own is written immediately, by itself.
+    """
+
+    terminator = "\n"
+
+    def __init__(self, fd: int, encoding: str = "utf-8"):
+        super().__init__()
+        self._fd = fd
+        self._encoding = encoding
+        self._buffer = bytearray()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = (self.format(record) + self.terminator).encode(self._encoding, "backslashreplace")
+            if len(self._buffer) + len(data) > LOG_BUFFER_SIZE:
+                self._write_buffer()
+            if len(data) > LOG_BUFFER_SIZE:
+                self._write(data)
+            else:
+                self._buffer += data
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            self._write_buffer()
+        except OSError:
+            # stderr is gone (e.g. during interpreter shutdown); nothing left to report to
+            self._buffer.clear()
+        finally:
+            self.release()
+
+    def _write_buffer(self) -> None:
+        if self._buffer:
+            data = bytes(self._buffer)
+            self._buffer.clear()
+            self._write(data)
+
+    def _write(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+def _console_handler() -> logging.Handler:
+    """Build the console handler, batched over the process's stderr file descriptor.
+
+    Falls back to a plain StreamHandler on sys.stderr when it has been redirected
+    (test capture, embedding apps), so those redirections still see every record.
+    """
+    if sys.stderr is not sys.__stderr__:
+        return logging.StreamHandler()
+    try:
+        fd = sys.__stderr__.fileno()
+    except (AttributeError, OSError, ValueError):
+        # No usable stderr descriptor, e.g. a windowed interpreter
+        return logging.StreamHandler()
+
+    handler = _BufferedFdHandler(fd, sys.__stderr__.encoding or "utf-8")
+
+    stop = threading.Event()
+
+    def flush_periodically():
+        while not stop.wait(LOG_FLUSH_INTERVAL):
+            handler.flush()
+
+    threading.Thread(target=flush_periodically, name="log-flush", daemon=True).start()
+    # atexit runs in reverse order: the listener drains the queue before this final flush
+    atexit.register(handler.flush)
+    atexit.register(stop.set)
+    return handler
 
 # Configure logging
 def _configure_logging():
-    """Configure structured logging for the application."""
+    """Configure structured logging for the application.
+
+    Idempotent: later calls keep the existing listener and handlers.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+
+    console = _console_handler()
+    console.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    console.setLevel(logging.INFO)
+
     logging_config = {
         "version": 1,
         "disable_existing_loggers": False,
-        "formatters": {
-            "standard": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            },
-            "detailed": {
-                "format": "%(asctime)s - %(name)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s"
-            }
-        },
         "handlers": {
-            "console": {
-                "class": "logging.StreamHandler",
-                "formatter": "standard",
-                "level": "INFO"
+            "queue": {
+                "()": logging.handlers.QueueHandler,
+                "queue": _log_queue
             }
         },
         "root": {
             "level": "INFO",
-            "handlers": ["console"]
+            "handlers": ["queue"]
         },
         "loggers": {
+            # Propagates to the root queue handler rather than attaching its own.
+            # INFO, not DEBUG: the console drops DEBUG anyway, and a disabled level
+            # short-circuits before any record is built or queued
             "app": {
-                "level": "DEBUG",
-                "handlers": ["console"],
-                "propagate": False
+                "level": "INFO"
             }
         }
     }
     logging.config.dictConfig(logging_config)
 
+    _log_listener = logging.handlers.QueueListener(_log_queue, console, respect_handler_level=True)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 _configure_logging()
 logger = logging.getLogger(__name__)
 
@@ -49,23 +158,77 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    # orjson encodes the nested /query payloads (floats, datetimes) in C
+    default_response_class=ORJSONResponse
 )
 
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS; skipped when no origins are configured (e.g. internal-only deployments),
+# so requests don't pay for origin matching they don't need
+_cors_origins = get_settings().cors_origin_list
+if _cors_origins:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=list(_cors_origins),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+# Hot symbols are queried far more often than their sentiment moves; reuse
+# a (symbol, window) result for this many seconds instead of re-collecting
+QUERY_CACHE_TTL = 60
+QUERY_CACHE_MAXSIZE = 1024
+
+# Results are kept encoded: hits skip serialization, and no caller can mutate a cached entry
+_query_cache: Dict[Tuple[str, str], Tuple[float, bytes]] = {}
+# Aggregations in progress, so concurrent misses for a key share one run
+_query_inflight: Dict[Tuple[str, str], "asyncio.Future[dict]"] = {}
+
+def _remember_query(key: Tuple[str, str], body: bytes) -> None:
+    _query_cache.pop(key, None)
+    if len(_query_cache) >= QUERY_CACHE_MAXSIZE:
+        # Dicts keep insertion order, so the first key is the oldest entry
+        _query_cache.pop(next(iter(_query_cache)))
+    _query_cache[key] = (time.monotonic() + QUERY_CACHE_TTL, body)
+
+# Probes hit /healthz constantly; reuse its encoded body for this many seconds
+HEALTH_CACHE_TTL = 1.0
+
+_health_cache: Tuple[float, bytes] = (0.0, b"")
+
+# Constant body for /, encoded once at import
+_ROOT_BODY = orjson.dumps({
+    "service": "Sentiment Bot API",
+    "version": "1.0.0",
+    "description": "Social media sentiment analysis for financial instruments",
+    "endpoints": {
+        "health": "/healthz",
+        "query": "/query?symbol=AAPL&window=24h",
+        "docs": "/docs",
+        "redoc": "/redoc"
+    }
+})
 
 @app.on_event("startup")
 async def startup():
-    """Log startup."""
+    """Warm up the DB pool and NLP models off the event loop, in parallel."""
     logger.info("Sentiment Bot API starting up")
 
+    # Otherwise the first /query pays for schema setup and several seconds of model loading
+    warmups = {
+        "database pool": get_pool,
+        "FinBERT": _get_finbert_model,
+        "embedding model": _get_embedding_model,
+    }
+    results = await asyncio.gather(
+        *(asyncio.to_thread(load) for load in warmups.values()),
+        return_exceptions=True
+    )
+    for name, result in zip(warmups, results):
+        if isinstance(result, Exception):
+            logger.warning("Warmup of %s failed: %s", name, result)
+
 @app.on_event("shutdown")
 async def shutdown():
     """Log shutdown."""
@@ -74,47 +237,66 @@ async def shutdown():
 @app.get("/healthz")
 def health_check():
     """Health check endpoint."""
+    global _health_cache
     try:
-        result = healthcheck()
-        return result
+        expires_at, body = _health_cache
+        now = time.monotonic()
+        if expires_at <= now:
+            body = orjson.dumps(healthcheck())
+            _health_cache = (now + HEALTH_CACHE_TTL, body)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         raise HTTPException(status_code=503, detail="Service unhealthy")
 
+def _window_param(window: str = Query("24h", description="Time window (e.g., 24h, 7d)")) -> str:
+    """Validate the window with the pipeline's own cached parser instead of a per-request regex."""
+    try:
+        _parse_window(window)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return window.lower()
+
 @app.get("/query")
-def query_sentiment(
+async def query_sentiment(
     symbol: str = Query(..., min_length=1, max_length=10, description="Stock symbol or company name"),
-    window: str = Query("24h", regex="^[0-9]+[hd]$", description="Time window (e.g., 24h, 7d)")
+    window: str = Depends(_window_param)
 ):
     """
     Query sentiment for a stock symbol across multiple social media sources.
 
     Returns aggregated sentiment scores from X, Reddit, StockTwits, and Discord.
     """
-    logger.info(f"Received query for symbol={symbol}, window={window}")
+    logger.info("Received query for symbol=%s, window=%s", symbol, window)
+
+    key = (symbol.upper(), window)
+    cached = _query_cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        logger.debug("Serving cached result for %s", symbol)
+        return Response(content=cached[1], media_type="application/json")
 
     try:
-        result = aggregate_social(symbol.upper(), window)
-        logger.info(f"Successfully processed query for {symbol}")
-        return result
+        task = _query_inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(aggregate_social_async(symbol.upper(), window))
+            _query_inflight[key] = task
+            task.add_done_callback(lambda _: _query_inflight.pop(key, None))
+        # Shielded: one client disconnecting must not cancel the run others are awaiting
+        result = await asyncio.shield(task)
+        logger.info("Successfully processed query for %s", symbol)
+        body = orjson.dumps(result)
+        # "No posts found" and the like should be retried, not pinned for the TTL
+        if "error" not in result:
+            _remember_query(key, body)
+        return Response(content=body, media_type="application/json")
     except ValueError as e:
-        logger.warning(f"Invalid query for {symbol}: {e}")
+        logger.warning("Invalid query for %s: %s", symbol, e)
         raise HTTPException(status_code=400, detail=f"Invalid input: {e}")
     except Exception as e:
-        logger.error(f"Error processing query for {symbol}: {e}", exc_info=True)
+        logger.error("Error processing query for %s: %s", symbol, e, exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to process query")
 
 @app.get("/")
 def root():
     """Root endpoint - service information."""
-    return {
-        "service": "Sentiment Bot API",
-        "version": "1.0.0",
-        "description": "Social media sentiment analysis for financial instruments",
-        "endpoints": {
-            "health": "/healthz",
-            "query": "/query?symbol=AAPL&window=24h",
-            "docs": "/docs",
-            "redoc": "/redoc"
-        }
-    }
+    return Response(content=_ROOT_BODY, media_type="application/json")
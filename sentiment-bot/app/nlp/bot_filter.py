@@ -1,5 +1,9 @@
 from app.services.types import SocialPost
 
+def is_cashtag_spam(text: str) -> bool:
+    """Text-only bot check, cheap enough to run before symbol extraction."""
+    return text.count('$') > 5
+
 def is_probable_bot(post: SocialPost) -> bool:
     # Simple heuristics - expand as needed
 
@@ -8,7 +12,7 @@ def is_probable_bot(post: SocialPost) -> bool:
         return True
 
     # Check for repetitive patterns
-    if post.text.count('$') > 5:
+    if is_cashtag_spam(post.text):
         return True
 
     # Very high post frequency accounts (would need historical data)
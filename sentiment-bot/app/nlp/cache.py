@@ -0,0 +1,114 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, TypeVar
+from app.services.types import SentimentScore
+from app.storage.cache import cache_get_many, cache_set_many
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+def text_key(prefix: str, text: str) -> str:
+    """Redis key for text: prefix plus a 128-bit BLAKE2b digest."""
+    return f"{prefix}:{hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()}"
+
+def encode_sentiment(score: SentimentScore) -> Optional[bytes]:
+    """Serialize a FinBERT score; heuristic fallbacks are not cached."""
+    return score.model_dump_json().encode("utf-8") if score.model == "finbert" else None
+
+def decode_sentiment(data: bytes) -> SentimentScore:
+    """Parse a score written by encode_sentiment."""
+    return SentimentScore.model_validate_json(data)
+
+EMBEDDING_DIM = 384
+
+def encode_embedding(row: Optional["np.ndarray"]) -> Optional[bytes]:
+    """Serialize a model embedding row as raw float32; a missing row (model unavailable) is not cached."""
+    import numpy as np
+
+    return None if row is None else row.astype(np.float32, copy=False).tobytes()
+
+def decode_embedding(data: bytes) -> "np.ndarray":
+    """Parse a row written by encode_embedding, rejecting truncated or foreign values."""
+    import numpy as np
+
+    if len(data) != EMBEDDING_DIM * 4:
+        raise ValueError(f"expected {EMBEDDING_DIM * 4} bytes, got {len(data)}")
+    return np.frombuffer(data, dtype=np.float32)
+
+def memoize_texts(prefix: str, batch_fn: Callable[[List[str]], Sequence[T]],
+                  encode: Callable[[T], Optional[bytes]], decode: Callable[[bytes], T],
+                  ttl: int = 3600, maxsize: int = 10_000) -> Callable[[List[str]], List[T]]:
+    """
+    Memoize a pure batch function of texts, in-process and in Redis.
+
+    Reposts and quote-posts repeat the same normalized text, so each distinct
+    text is computed once. Hot repeats are served from an in-process LRU;
+    other workers share results through Redis for ``ttl`` seconds. Only the
+    texts missing from both layers are passed to ``batch_fn``, in one call.
+
+    Results that ``encode`` maps to None are returned but cached in neither
+    layer, so one worker's degraded output is never served by the others.
+
+    Args:
+        prefix: Redis key namespace, e.g. "sentiment"
+        batch_fn: Function mapping a list of texts to aligned results
+        encode: Serializes a result for Redis, or returns None if it must not be cached
+        decode: Inverse of encode; may raise on malformed data, which is then recomputed
+        ttl: Redis expiry in seconds
+        maxsize: In-process LRU size
+
+    Returns:
+        Memoized function returning results aligned with its input
+    """
+    local: "OrderedDict[str, T]" = OrderedDict()
+    lock = threading.Lock()
+
+    def memoized(texts: List[str]) -> List[T]:
+        results: Dict[str, T] = {}
+        with lock:
+            for t in texts:
+                if t in local:
+                    local.move_to_end(t)
+                    results[t] = local[t]
+
+        missing = [t for t in dict.fromkeys(texts) if t not in results]
+        if missing:
+            for t, hit in zip(missing, cache_get_many([text_key(prefix, t) for t in missing])):
+                if hit is None:
+                    continue
+                try:
+                    results[t] = decode(hit)
+                except Exception as e:
+                    logger.warning("Discarding unreadable cache entry for %s: %s", prefix, e)
+
+            uncacheable = set()
+            todo = [t for t in missing if t not in results]
+            if todo:
+                computed = batch_fn(todo)
+                results.update(zip(todo, computed))
+                encoded = {}
+                for t in todo:
+                    data = encode(results[t])
+                    if data is None:
+                        uncacheable.add(t)
+                    else:
+                        encoded[text_key(prefix, t)] = data
+                cache_set_many(encoded, ttl)
+
+            with lock:
+                for t in missing:
+                    if t not in uncacheable:
+                        local[t] = results[t]
+                while len(local) > maxsize:
+                    local.popitem(last=False)
+
+        return [results[t] for t in texts]
+
+    memoized.__wrapped__ = batch_fn
+    return memoized
@@ -1,24 +1,34 @@
 import re
-from typing import List
+from functools import lru_cache
+from typing import FrozenSet, Optional
+
+_URL_RE = re.compile(r'https?://\S+')
+_CASHTAG_RE = re.compile(r'\$([A-Z]{1,5})(?![A-Z])')
 
 def normalize_post(t: str) -> str:
-    # Remove URLs
-    t = re.sub(r'https?://\S+', '', t)
-    # Remove excessive whitespace
-    t = re.sub(r'\s+', ' ', t)
-    t = t.strip()
-    return t
+    # Remove URLs; most posts have none, and the substring check is far cheaper than a regex scan
+    if '://' in t:
+        t = _URL_RE.sub('', t)
+    # Collapse whitespace runs and trim in one pass
+    return ' '.join(t.split())
 
-def extract_symbols(t: str, inst: dict) -> List[str]:
-    # Extract cashtags
-    tickers = set(re.findall(r'\$([A-Z]{1,5})(?![A-Z])', t))
+@lru_cache(maxsize=1024)
+def _instrument_pattern(symbol: str, company_name: Optional[str]) -> Optional["re.Pattern"]:
+    """One case-insensitive alternation over an instrument's symbol and company name."""
+    names = {n for n in (symbol.upper(), (company_name or "").upper()) if n}
+    if not names:
+        return None
+    return re.compile('|'.join(re.escape(n) for n in sorted(names, key=len, reverse=True)),
+                      re.IGNORECASE)
 
-    # Add instrument symbol if mentioned
-    if inst["symbol"] in t.upper() or inst["symbol"] in tickers:
-        tickers.add(inst["symbol"])
+def extract_symbols(t: str, inst: dict) -> FrozenSet[str]:
+    # Extract cashtags
+    tickers = set(_CASHTAG_RE.findall(t))
 
-    # Add if company name mentioned
-    if inst["company_name"] and inst["company_name"].upper() in t.upper():
+    # Add instrument symbol if its ticker or company name is mentioned;
+    # a matching cashtag always contains the bare symbol, so one scan covers all three
+    pattern = _instrument_pattern(inst["symbol"], inst["company_name"])
+    if pattern is not None and pattern.search(t):
         tickers.add(inst["symbol"])
 
-    return list(tickers)
+    return frozenset(tickers)
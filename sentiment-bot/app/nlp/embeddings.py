@@ -1,29 +1,34 @@
+import hashlib
 import logging
-import numpy as np
-from sentence_transformers import SentenceTransformer
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
-# Global model cache
-_embedding_model = None
+# Texts per forward pass inside SentenceTransformer.encode
+EMBEDDING_BATCH_SIZE = 64
+
+# all-MiniLM-L6-v2: 384-dim, fast, good for semantic similarity
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
 
+@lru_cache(maxsize=1)
 def _get_embedding_model():
-    """Load sentence-transformers model (cached after first load)."""
-    global _embedding_model
-
-    if _embedding_model is None:
-        try:
-            # all-MiniLM-L6-v2: 384-dim, fast, good for semantic similarity
-            model_name = "sentence-transformers/all-MiniLM-L6-v2"
-            _embedding_model = SentenceTransformer(model_name)
-            logger.info(f"Loaded embedding model: {model_name}")
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            _embedding_model = "error"
-
-    return _embedding_model if _embedding_model != "error" else None
-
-def compute_embedding(text: str) -> np.ndarray:
+    """Load sentence-transformers model once; None (also cached) if it can't be loaded."""
+    try:
+        # Deferred: sentence-transformers pulls in torch, which dominates startup time
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        logger.info("Loaded embedding model: %s", EMBEDDING_MODEL_NAME)
+        return model
+    except Exception as e:
+        logger.error("Failed to load embedding model: %s", e)
+        return None
+
+def compute_embedding(text: str) -> "np.ndarray":
     """
     Compute semantic embedding for text using sentence-transformers.
 
@@ -35,25 +40,71 @@ def compute_embedding(text: str) -> np.ndarray:
     Returns:
         384-dim normalized embedding vector
     """
-    model = _get_embedding_model()
+    return compute_embeddings([text])[0]
+
+def compute_embeddings(texts: List[str]) -> "np.ndarray":
+    """
+    Compute embeddings for a batch of texts in one encode call.
 
-    if model is not None:
-        try:
-            # Truncate very long text
-            max_length = 512
-            if len(text) > max_length:
-                text = text[:max_length]
+    Falls back to hash-based embeddings if the model is unavailable or fails.
 
-            # Encode and normalize
-            embedding = model.encode(text, normalize_embeddings=True)
-            return embedding.astype(np.float32)
-        except Exception as e:
-            logger.warning(f"Embedding inference failed: {e}. Using fallback hash-based embedding.")
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        (N, 384) float32 matrix, one normalized row per text
+    """
+    import numpy as np
+
+    if not texts:
+        return np.empty((0, 384), dtype=np.float32)
+
+    embeddings = _model_embeddings(texts)
+    if embeddings is not None:
+        return embeddings
 
     # Fallback: deterministic hash-based embedding (same output for same input)
-    return _hash_based_embedding(text, dim=384)
+    return _hash_based_embeddings(texts, dim=384)
+
+def model_embeddings(texts: List[str]) -> List[Optional["np.ndarray"]]:
+    """
+    Embed texts with the neural model only, without the hash fallback.
+
+    Rows are copies, so a row kept in a cache doesn't pin the whole batch matrix.
+
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        One 384-dim row per text, or all None if the model is unavailable or fails
+    """
+    embeddings = _model_embeddings(texts) if texts else None
+    if embeddings is None:
+        return [None] * len(texts)
+    return [row.copy() for row in embeddings]
 
-def _hash_based_embedding(text: str, dim: int = 384) -> np.ndarray:
+def _model_embeddings(texts: List[str]) -> Optional["np.ndarray"]:
+    """One model encode call over texts; None if the model is unavailable or fails."""
+    import numpy as np
+
+    model = _get_embedding_model()
+    if model is None:
+        return None
+
+    try:
+        # Truncate very long text; the tokenizer caps at the model's max length anyway
+        embeddings = model.encode(
+            [t[:512] for t in texts],
+            batch_size=EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return embeddings.astype(np.float32, copy=False)
+    except Exception as e:
+        logger.warning("Embedding inference failed: %s. Using fallback hash-based embedding.", e)
+        return None
+
+def _hash_based_embedding(text: str, dim: int = 384) -> "np.ndarray":
     """
     Generate deterministic embedding from text hash.
 
@@ -64,12 +115,40 @@ def _hash_based_embedding(text: str, dim: int = 384) -> np.ndarray:
         dim: Embedding dimensionality
 
     Returns:
-        Normalized random vector seeded by text hash
+        Normalized vector expanded from a BLAKE2b digest of the text
+    """
+    return _hash_based_embeddings([text], dim)[0]
+
+def _hash_based_embeddings(texts: List[str], dim: int = 384) -> "np.ndarray":
     """
-    np.random.seed(hash(text) % (2**32))
-    emb = np.random.randn(dim).astype(np.float32)
-    # Normalize to unit length
-    norm = np.linalg.norm(emb)
-    if norm > 0:
-        emb = emb / norm
+    Batch form of _hash_based_embedding.
+
+    Args:
+        texts: Texts to embed
+        dim: Embedding dimensionality
+
+    Returns:
+        (N, dim) float32 matrix of unit-length rows
+    """
+    import numpy as np
+
+    # One hash byte per dimension: a quarter of the hashing of 4-byte components,
+    # and int8 bits can't decode to NaN/inf the way raw float32 bits could
+    buf = b"".join(_hash_bytes(t, dim) for t in texts)
+    emb = np.frombuffer(buf, dtype=np.int8).reshape(len(texts), -1)[:, :dim].astype(np.float32)
+    # Center [-128, 127] on zero
+    emb += 0.5
+    # Normalize rows to unit length in place
+    norms = np.linalg.norm(emb, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    emb /= norms
     return emb
+
+def _hash_bytes(text: str, n_bytes: int) -> bytes:
+    """Counter-mode expansion: hash the text once, then derive 64-byte blocks from that digest."""
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=64).digest()
+    n_blocks = -(-n_bytes // 64)
+    return b"".join(
+        hashlib.blake2b(digest + i.to_bytes(2, "little"), digest_size=64).digest()
+        for i in range(n_blocks)
+    )
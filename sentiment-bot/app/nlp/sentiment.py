@@ -1,34 +1,133 @@
 import logging
-from typing import Optional
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+from typing import FrozenSet, Iterable, List, Optional
 from app.services.types import SentimentScore
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
-# Global model cache
-_model_cache = {}
+_POSITIVE_WORDS = frozenset(['bullish', 'moon', 'buy', 'long', 'growth', 'profit',
+                             'gain', 'up', 'surge', 'boom', 'excellent', 'great', 'strong'])
+_NEGATIVE_WORDS = frozenset(['bearish', 'crash', 'sell', 'short', 'loss', 'down',
+                             'dump', 'fall', 'decline', 'terrible', 'bad', 'weak'])
 
+_SARCASM_INDICATORS = {
+    'yeah right': 0.8,
+    'sure': 0.5,
+    '🙄': 0.9,
+    'lol': 0.3,
+    'obviously': 0.6,
+    'brilliant': 0.5,  # Context-dependent
+}
+
+# Signed lexicon: one lookup per hit gives both membership and direction
+_LEXICON = {**{w: 1 for w in _POSITIVE_WORDS}, **{w: -1 for w in _NEGATIVE_WORDS}}
+
+def _keyword_pattern(keywords: Iterable[str], flags: int = 0) -> "re.Pattern":
+    """Compile keywords into one alternation, longest first, word-bounded where possible."""
+    alternatives = []
+    for kw in sorted(keywords, key=len, reverse=True):
+        escaped = re.escape(kw)
+        if kw[0].isalnum() and kw[-1].isalnum():
+            escaped = rf'\b{escaped}\b'
+        alternatives.append(escaped)
+    return re.compile('(' + '|'.join(alternatives) + ')', flags)
+
+# Sentiment and sarcasm keywords share one case-insensitive pattern, so a
+# single scan serves both and the text is never lower-cased as a whole
+_KEYWORD_RE = _keyword_pattern(_LEXICON.keys() | _SARCASM_INDICATORS.keys(), re.IGNORECASE)
+
+def _keyword_hits(text: str) -> FrozenSet[str]:
+    """Return the distinct lower-cased keywords found in text."""
+    return frozenset(h.lower() for h in _KEYWORD_RE.findall(text))
+
+def _keyword_hits_batch(texts: List[str]) -> List[FrozenSet[str]]:
+    """
+    Keyword hits for many texts from a single regex scan over their concatenation.
+
+    Texts are joined with NUL, which no keyword contains and which ends a word, so
+    no match spans two texts; each match is mapped back by its offset.
+    """
+    # ends[i] is the offset just past text i's separator
+    ends = list(accumulate(len(t) + 1 for t in texts))
+    hits = [set() for _ in texts]
+    for m in _KEYWORD_RE.finditer("\x00".join(texts)):
+        hits[bisect_right(ends, m.start())].add(m.group().lower())
+    return [frozenset(h) for h in hits]
+
+# Social posts are short; 128 tokens covers nearly all of them and keeps padded batches small
+FINBERT_MAX_LENGTH = 128
+FINBERT_BATCH_SIZE = 32
+
+FINBERT_MODEL_NAME = "ProsusAI/finbert"
+# CPU by default (works faster for inference on typical systems)
+DEVICE = "cpu"
+
+@lru_cache(maxsize=1)
 def _get_finbert_model():
-    """Load FinBERT model (cached after first load)."""
-    if "finbert" not in _model_cache:
-        try:
-            model_name = "ProsusAI/finbert"
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForSequenceClassification.from_pretrained(model_name)
+    """Load FinBERT model once; None (also cached) if it can't be loaded."""
+    try:
+        # Deferred: transformers/torch add seconds to import time
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
-            # Use CPU by default (works faster for inference on typical systems)
-            device = "cpu"
-            model.to(device)
-            model.eval()
+        tokenizer = AutoTokenizer.from_pretrained(FINBERT_MODEL_NAME)
+        model = AutoModelForSequenceClassification.from_pretrained(FINBERT_MODEL_NAME)
+        model.to(DEVICE)
+        model.eval()
 
-            _model_cache["finbert"] = (tokenizer, model, device)
-            logger.info(f"Loaded FinBERT model on {device}")
-        except Exception as e:
-            logger.error(f"Failed to load FinBERT: {e}. Falling back to heuristics.")
-            return None
+        settings = get_settings()
+        if settings.finbert_int8:
+            model = _quantize_int8(model)
+        if settings.finbert_compile:
+            model = _compile(model, tokenizer)
+
+        logger.info("Loaded FinBERT model on %s", DEVICE)
+        return tokenizer, model
+    except Exception as e:
+        logger.error("Failed to load FinBERT: %s. Falling back to heuristics.", e)
+        return None
+
+def _quantize_int8(model):
+    """
+    Dynamically quantize the model's Linear layers to INT8 for CPU inference.
+
+    Weights are quantized once here; activations are quantized per batch. Returns
+    the FP32 model unchanged if this torch build has no quantized CPU engine.
+    """
+    import torch
 
-    return _model_cache.get("finbert")
+    if not any(engine != "none" for engine in torch.backends.quantized.supported_engines):
+        logger.info("No quantized CPU engine available; keeping FinBERT in FP32")
+        return model
+    try:
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    except Exception as e:
+        logger.warning("INT8 quantization failed: %s. Keeping FinBERT in FP32.", e)
+        return model
+
+def _compile(model, tokenizer):
+    """
+    Compile the model with TorchInductor so the forward pass runs as fused kernels.
+
+    torch.compile is lazy, so a warm-up batch is run here: compile errors surface at
+    load time rather than on the first request, and that cost is paid up front.
+    Returns the eager model if compilation or the warm-up fails.
+    """
+    import torch
+
+    try:
+        compiled = torch.compile(model, dynamic=True)
+        inputs = tokenizer(["$SPY warm-up"], return_tensors="pt", truncation=True,
+                           max_length=FINBERT_MAX_LENGTH, padding=True).to(DEVICE)
+        with torch.inference_mode():
+            _finbert_forward(compiled, inputs)
+        return compiled
+    except Exception as e:
+        logger.warning("torch.compile unavailable: %s. Keeping eager FinBERT.", e)
+        return model
 
 def score_text(text: str) -> SentimentScore:
     """
@@ -42,106 +141,135 @@ def score_text(text: str) -> SentimentScore:
     Returns:
         SentimentScore with polarity (-1 to +1) and confidence
     """
-    # Try FinBERT first
+    return score_texts([text])[0]
+
+def score_texts(texts: List[str]) -> List[SentimentScore]:
+    """
+    Score a batch of texts with batched FinBERT forward passes.
+
+    Falls back to heuristics if model loading or inference fails.
+
+    Args:
+        texts: Texts to analyze for sentiment
+
+    Returns:
+        SentimentScore per text, aligned with ``texts``
+    """
+    if not texts:
+        return []
+
     model_tuple = _get_finbert_model()
 
     if model_tuple:
         try:
-            tokenizer, model, device = model_tuple
-
-            # Truncate text to max length (512 tokens for BERT)
-            max_length = 512
-            inputs = tokenizer(
-                text[:512],  # Approximate truncation before tokenizing
-                return_tensors="pt",
-                truncation=True,
-                max_length=max_length,
-                padding=True
-            ).to(device)
-
-            with torch.no_grad():
-                outputs = model(**inputs)
-                logits = outputs.logits
-
-            # FinBERT has 3 classes: [negative, neutral, positive]
-            probabilities = torch.softmax(logits, dim=-1)[0].cpu().numpy()
-
-            # Map classes to sentiment
-            # negative = -1, neutral = 0, positive = +1
-            polarity = (probabilities[2] - probabilities[0]).item()  # pos - neg
-
-            # Confidence is the highest probability
-            confidence = float(probabilities.max())
-
-            # Subjectivity: how confident the model is (opposite of neutral probability)
-            subjectivity = 1.0 - float(probabilities[1])
-
-            return SentimentScore(
-                polarity=max(-1.0, min(1.0, polarity)),
-                subjectivity=subjectivity,
-                sarcasm_prob=_detect_sarcasm(text),
-                confidence=confidence,
-                model="finbert"
-            )
+            import torch
+
+            tokenizer, model = model_tuple
+
+            scores = []
+            for start in range(0, len(texts), FINBERT_BATCH_SIZE):
+                batch = texts[start:start + FINBERT_BATCH_SIZE]
+                inputs = tokenizer(
+                    [t[:512] for t in batch],  # Approximate truncation before tokenizing
+                    return_tensors="pt",
+                    truncation=True,
+                    max_length=FINBERT_MAX_LENGTH,
+                    padding=True
+                ).to(DEVICE)
+
+                with torch.inference_mode():
+                    polarity, confidence, subjectivity = _finbert_forward(model, inputs).cpu().tolist()
+
+                scores.extend(_finbert_scores(batch, _keyword_hits_batch(batch),
+                                              polarity, confidence, subjectivity))
+            return scores
         except Exception as e:
-            logger.warning(f"FinBERT inference failed: {e}. Falling back to heuristics.")
+            logger.warning("FinBERT inference failed: %s. Falling back to heuristics.", e)
 
     # Fallback to heuristics
-    return _score_text_heuristic(text)
+    return [_score_text_heuristic(t, h) for t, h in zip(texts, _keyword_hits_batch(texts))]
 
-def _score_text_heuristic(text: str) -> SentimentScore:
+def _finbert_forward(model, inputs):
     """
-    Simple heuristic-based sentiment scoring (fallback).
+    Run FinBERT and reduce logits to score columns without leaving torch.
+
+    Returns:
+        [3, B] tensor of polarity, confidence and subjectivity rows
+    """
+    import torch
+
+    # FinBERT has 3 classes: [negative, neutral, positive]
+    probabilities = model(**inputs).logits.softmax(dim=-1)
+    return torch.stack((
+        # negative = -1, neutral = 0, positive = +1
+        (probabilities[:, 2] - probabilities[:, 0]).clamp(-1.0, 1.0),
+        # Confidence is the highest probability
+        probabilities.amax(dim=-1),
+        # Subjectivity: how confident the model is (opposite of neutral probability)
+        1.0 - probabilities[:, 1],
+    ))
+
+def _finbert_scores(texts: List[str], hits: List[FrozenSet[str]], polarity: List[float],
+                    confidence: List[float], subjectivity: List[float]) -> List[SentimentScore]:
+    """Build SentimentScores from per-text FinBERT score columns."""
+    # Values are already bounded by _finbert_forward, so skip pydantic validation
+    return [
+        SentimentScore.model_construct(
+            polarity=polarity[i],
+            subjectivity=subjectivity[i],
+            sarcasm_prob=_detect_sarcasm(text, hits[i]),
+            confidence=confidence[i],
+            model="finbert"
+        )
+        for i, text in enumerate(texts)
+    ]
+
+def _score_text_heuristic(text: str, hits: Optional[FrozenSet[str]] = None) -> SentimentScore:
     """
-    positive_words = ['bullish', 'moon', 'buy', 'long', 'growth', 'profit',
-                     'gain', 'up', 'surge', 'boom', 'excellent', 'great', 'strong']
-    negative_words = ['bearish', 'crash', 'sell', 'short', 'loss', 'down',
-                     'dump', 'fall', 'decline', 'terrible', 'bad', 'weak']
+    Simple heuristic-based sentiment scoring (fallback).
 
-    text_lower = text.lower()
-    pos_count = sum(1 for word in positive_words if word in text_lower)
-    neg_count = sum(1 for word in negative_words if word in text_lower)
+    Args:
+        text: Text to score
+        hits: Keyword hits already found in ``text``, e.g. from a batch scan
+    """
+    # One regex pass instead of a substring scan per keyword
+    if hits is None:
+        hits = _keyword_hits(text)
+    signs = [_LEXICON[h] for h in hits if h in _LEXICON]
 
-    total = pos_count + neg_count
+    total = len(signs)
     if total == 0:
         polarity = 0.0
         confidence = 0.3
     else:
-        polarity = (pos_count - neg_count) / total
+        # sum(signs) is positive hits minus negative hits
+        polarity = sum(signs) / total
         confidence = min(0.7, total / 5)
 
     # Subjectivity based on length
     subjectivity = min(1.0, (len(text) / 280) * 0.7)
 
-    return SentimentScore(
+    return SentimentScore.model_construct(
         polarity=max(-1.0, min(1.0, polarity)),
         subjectivity=subjectivity,
-        sarcasm_prob=_detect_sarcasm(text),
+        sarcasm_prob=_detect_sarcasm(text, hits),
         confidence=confidence,
         model="heuristic"
     )
 
-def _detect_sarcasm(text: str) -> float:
+def _detect_sarcasm(text: str, hits: Optional[FrozenSet[str]] = None) -> float:
     """
     Detect potential sarcasm in text.
 
+    Args:
+        text: Text to inspect
+        hits: Keyword hits already found in ``text``, to skip a second scan
+
     Returns probability between 0.0 and 1.0
     """
-    sarcasm_indicators = {
-        'yeah right': 0.8,
-        'sure': 0.5,
-        '🙄': 0.9,
-        'lol': 0.3,
-        'obviously': 0.6,
-        'brilliant': 0.5,  # Context-dependent
-    }
-
-    text_lower = text.lower()
-    max_sarcasm = 0.0
-
-    for indicator, score in sarcasm_indicators.items():
-        if indicator in text_lower:
-            max_sarcasm = max(max_sarcasm, score)
+    if hits is None:
+        hits = _keyword_hits(text)
+    max_sarcasm = max((_SARCASM_INDICATORS[h] for h in hits if h in _SARCASM_INDICATORS), default=0.0)
 
     # Default low probability if no indicators
     return max_sarcasm if max_sarcasm > 0 else 0.05
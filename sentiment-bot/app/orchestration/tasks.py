@@ -1,33 +1,60 @@
+import asyncio
 import datetime as dt
 import logging
-from typing import Dict, List
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+from app.config import get_settings
 from app.services.resolver import resolve
 from app.services.reddit_client import search_reddit_bundle
 from app.services.x_client import search_x_bundle
 from app.services.stocktwits_client import collect_stocktwits
 from app.services.discord_client import collect_discord
 from app.nlp.clean import normalize_post, extract_symbols
-from app.nlp.sentiment import score_text
-from app.nlp.embeddings import compute_embedding
-from app.nlp.bot_filter import is_probable_bot
+from app.nlp.sentiment import score_texts
+from app.nlp.embeddings import _hash_based_embeddings, model_embeddings
+from app.nlp.bot_filter import is_cashtag_spam, is_probable_bot
+from app.nlp.cache import (
+    decode_embedding, decode_sentiment, encode_embedding, encode_sentiment, memoize_texts
+)
 from app.storage.db import DB
-from app.services.types import SocialPost
+from app.services.types import ResolvedInstrument, SentimentScore, SocialPost
+
+if TYPE_CHECKING:
+    import numpy as np
 
 logger = logging.getLogger(__name__)
 
+_WINDOW_RE = re.compile(r'^([0-9]+)([hd])$', re.IGNORECASE)
+_WINDOW_UNIT_SECONDS = {'h': 3600, 'd': 86400}
+
+# Reposts share normalized text, so score and embed each distinct text once
+_score_texts = memoize_texts("sentiment", score_texts, encode_sentiment, decode_sentiment)
+_model_embeddings = memoize_texts("embedding", model_embeddings, encode_embedding, decode_embedding)
+
+def _compute_embeddings(texts: List[str]) -> List["np.ndarray"]:
+    """Memoized model embeddings, with uncached hash fallbacks for texts the model couldn't embed."""
+    rows = _model_embeddings(texts)
+    missing = [i for i, row in enumerate(rows) if row is None]
+    if missing:
+        for i, row in zip(missing, _hash_based_embeddings([texts[i] for i in missing])):
+            rows[i] = row
+    return rows
+
 def healthcheck() -> Dict:
     """Health check with timestamp."""
     try:
         return {
             "status": "ok",
-            "timestamp": dt.datetime.utcnow().isoformat(),
+            "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
             "version": "1.0.0"
         }
     except Exception as e:
-        logger.error(f"Health check failed: {e}")
+        logger.error("Health check failed: %s", e)
         return {
             "status": "error",
-            "timestamp": dt.datetime.utcnow().isoformat(),
+            "timestamp": dt.datetime.now(dt.timezone.utc).isoformat(),
             "error": str(e)
         }
 
@@ -45,73 +72,110 @@ def aggregate_social(symbol: str, window: str = "24h") -> Dict:
     Raises:
         ValueError: If symbol cannot be resolved
     """
-    logger.info(f"Starting sentiment aggregation for symbol={symbol}, window={window}")
+    inst, inst_dict, since = _prepare(symbol, window)
+
+    # Sources are network-bound, so overlap them: collection takes the slowest
+    # source's latency rather than the sum
+    collectors = _source_collectors()
+    with ThreadPoolExecutor(max_workers=len(collectors)) as pool:
+        futures = [pool.submit(_collect_source, label, collect, inst_dict, since)
+                   for _, label, collect in collectors]
+        results = [f.result() for f in futures]
+
+    posts: List[SocialPost] = []
+    sources_status = {}
+    for (name, _, _), source_posts in zip(collectors, results):
+        posts.extend(source_posts)
+        sources_status[name] = len(source_posts)
+
+    return _process_posts(symbol, inst, inst_dict, since, posts, sources_status)
+
+async def aggregate_social_async(symbol: str, window: str = "24h") -> Dict:
+    """
+    Async form of aggregate_social for the API event loop.
+
+    The four source collectors run concurrently, so collection takes as long
+    as the slowest source rather than the sum of all four. Blocking work
+    (resolution, scoring, DB writes) runs in worker threads.
+
+    Args:
+        symbol: Stock symbol to analyze
+        window: Time window for analysis (e.g., "24h", "7d")
+
+    Returns:
+        Dictionary with aggregated sentiment results
+
+    Raises:
+        ValueError: If symbol cannot be resolved
+    """
+    inst, inst_dict, since = await asyncio.to_thread(_prepare, symbol, window)
+
+    collectors = _source_collectors()
+    results = await asyncio.gather(*(
+        asyncio.to_thread(_collect_source, label, collect, inst_dict, since)
+        for _, label, collect in collectors
+    ))
+
+    posts: List[SocialPost] = []
+    sources_status = {}
+    for (name, _, _), source_posts in zip(collectors, results):
+        posts.extend(source_posts)
+        sources_status[name] = len(source_posts)
+
+    return await asyncio.to_thread(
+        _process_posts, symbol, inst, inst_dict, since, posts, sources_status
+    )
+
+def _prepare(symbol: str, window: str) -> Tuple[ResolvedInstrument, Dict, dt.datetime]:
+    """Resolve the symbol and window start; raises ValueError on bad input."""
+    logger.info("Starting sentiment aggregation for symbol=%s, window=%s", symbol, window)
 
     # Resolve symbol
     try:
         inst = resolve(symbol)
         inst_dict = inst.model_dump()
-        logger.debug(f"Resolved {symbol} to {inst.company_name}")
+        logger.debug("Resolved %s to %s", symbol, inst.company_name)
     except Exception as e:
-        logger.error(f"Failed to resolve symbol {symbol}: {e}")
+        logger.error("Failed to resolve symbol %s: %s", symbol, e)
         raise ValueError(f"Could not resolve symbol: {symbol}")
 
     # Parse time window
     try:
         since = dt.datetime.utcnow() - _parse_window(window)
-        logger.debug(f"Analyzing posts since {since.isoformat()}")
+        logger.debug("Analyzing posts since %s", since.isoformat())
     except Exception as e:
-        logger.error(f"Failed to parse window {window}: {e}")
+        logger.error("Failed to parse window %s: %s", window, e)
         raise ValueError(f"Invalid time window: {window}")
 
-    # Collect from all sources
-    posts: List[SocialPost] = []
-    sources_status = {}
+    return inst, inst_dict, since
 
-    # X/Twitter
-    try:
-        x_posts = search_x_bundle(inst_dict, since)
-        posts.extend(x_posts)
-        sources_status["x"] = len(x_posts)
-        logger.info(f"Collected {len(x_posts)} posts from X")
-    except Exception as e:
-        logger.warning(f"Failed to collect from X: {e}")
-        sources_status["x"] = 0
+def _source_collectors() -> List[Tuple[str, str, Callable[[Dict, dt.datetime], List[SocialPost]]]]:
+    """(status key, display name, collector) for every source, looked up at call time."""
+    return [
+        ("x", "X", search_x_bundle),
+        ("reddit", "Reddit", search_reddit_bundle),
+        ("stocktwits", "StockTwits", collect_stocktwits),
+        ("discord", "Discord", collect_discord),
+    ]
 
-    # Reddit
+def _collect_source(label: str, collect: Callable, inst_dict: Dict,
+                    since: dt.datetime) -> List[SocialPost]:
+    """Run one collector; a failing source contributes no posts instead of failing the query."""
     try:
-        reddit_posts = search_reddit_bundle(inst_dict, since)
-        posts.extend(reddit_posts)
-        sources_status["reddit"] = len(reddit_posts)
-        logger.info(f"Collected {len(reddit_posts)} posts from Reddit")
+        source_posts = collect(inst_dict, since)
+        logger.info("Collected %s posts from %s", len(source_posts), label)
+        return source_posts
     except Exception as e:
-        logger.warning(f"Failed to collect from Reddit: {e}")
-        sources_status["reddit"] = 0
+        logger.warning("Failed to collect from %s: %s", label, e)
+        return []
 
-    # StockTwits
-    try:
-        st_posts = collect_stocktwits(inst_dict, since)
-        posts.extend(st_posts)
-        sources_status["stocktwits"] = len(st_posts)
-        logger.info(f"Collected {len(st_posts)} posts from StockTwits")
-    except Exception as e:
-        logger.warning(f"Failed to collect from StockTwits: {e}")
-        sources_status["stocktwits"] = 0
-
-    # Discord
-    try:
-        discord_posts = collect_discord(inst_dict, since)
-        posts.extend(discord_posts)
-        sources_status["discord"] = len(discord_posts)
-        logger.info(f"Collected {len(discord_posts)} posts from Discord")
-    except Exception as e:
-        logger.warning(f"Failed to collect from Discord: {e}")
-        sources_status["discord"] = 0
-
-    logger.info(f"Total posts collected: {len(posts)}")
+def _process_posts(symbol: str, inst: ResolvedInstrument, inst_dict: Dict, since: dt.datetime,
+                   posts: List[SocialPost], sources_status: Dict) -> Dict:
+    """Clean, score, persist and aggregate collected posts."""
+    logger.info("Total posts collected: %s", len(posts))
 
     if not posts:
-        logger.warning(f"No posts found for {symbol}")
+        logger.warning("No posts found for %s", symbol)
         return {
             "symbol": symbol,
             "posts_found": 0,
@@ -130,35 +194,48 @@ def aggregate_social(symbol: str, window: str = "24h") -> Dict:
         "processed": 0
     }
 
+    # Texts are gathered as a column alongside clean_posts for the batch stages below
+    texts: List[str] = []
+
     for p in posts:
         try:
             # Normalize text
-            p.text = normalize_post(p.text)
+            text = normalize_post(p.text)
+            p.text = text
+
+            # Cheapest rejection first: cashtag spam needs no symbol extraction
+            if is_cashtag_spam(text):
+                filter_stats["probable_bots"] += 1
+                continue
 
-            # Extract symbols
-            p.symbols = list(set(extract_symbols(p.text, inst_dict)))
+            # Extract symbols; already deduplicated, so only kept posts pay for a list
+            symbols = extract_symbols(text, inst_dict)
 
             # Filter out posts with no symbols or probable bots
-            if not p.symbols:
+            if not symbols:
                 filter_stats["no_symbols"] += 1
                 continue
 
+            p.symbols = list(symbols)
+
             if is_probable_bot(p):
                 filter_stats["probable_bots"] += 1
                 continue
 
             clean_posts.append(p)
+            texts.append(text)
             filter_stats["processed"] += 1
 
         except Exception as e:
-            logger.warning(f"Failed to clean post from {p.source}: {e}")
+            logger.warning("Failed to clean post from %s: %s", p.source, e)
             continue
 
-    logger.info(f"Cleaned posts: {filter_stats['processed']}/{filter_stats['total_input']} "
-                f"(filtered: {filter_stats['no_symbols']} no symbols, {filter_stats['probable_bots']} bots)")
+    logger.info("Cleaned posts: %s/%s (filtered: %s no symbols, %s bots)",
+                filter_stats["processed"], filter_stats["total_input"],
+                filter_stats["no_symbols"], filter_stats["probable_bots"])
 
     if not clean_posts:
-        logger.warning(f"No posts passed filtering for {symbol}")
+        logger.warning("No posts passed filtering for %s", symbol)
         return {
             "symbol": symbol,
             "posts_found": len(posts),
@@ -168,29 +245,39 @@ def aggregate_social(symbol: str, window: str = "24h") -> Dict:
             "error": "No valid posts after filtering"
         }
 
-    # Persist, score, and embed
-    db = DB()
-    processed_count = 0
-
-    for p in clean_posts:
-        try:
-            # Upsert post
-            pk = db.upsert_post(p)
+    # Score and embed the whole batch so the writes below can be batched too
+    try:
+        sentiments = _score_texts(texts)
+        scored_posts = clean_posts
+    except Exception as e:
+        logger.error("Failed to score %s posts for %s: %s", len(texts), symbol, e)
+        scored_posts, sentiments = [], []
 
-            # Score sentiment
-            sentiment = score_text(p.text)
-            db.upsert_sentiment(pk, sentiment)
+    embed_idx = _embedding_indices(texts, sentiments) if sentiments else []
+    embed_texts = [texts[i] for i in embed_idx]
+    try:
+        embeddings = _compute_embeddings(embed_texts)
+    except Exception as e:
+        # Scored posts are still worth keeping; hash embeddings stand in for the model
+        logger.warning("Failed to embed %s posts for %s, using hash embeddings: %s",
+                       len(embed_texts), symbol, e)
+        embeddings = list(_hash_based_embeddings(embed_texts)) if embed_texts else []
 
-            # Compute and store embedding
-            emb = compute_embedding(p.text)
-            db.upsert_embedding(pk, emb)
+    # Persist posts, then sentiments, then embeddings as three bulk upserts in one
+    # transaction, so a failure part-way never leaves posts without their scores
+    db = DB()
+    processed_count = 0
 
-            processed_count += 1
-        except Exception as e:
-            logger.warning(f"Failed to process post {p.platform_id} from {p.source}: {e}")
-            continue
+    try:
+        with db.transaction():
+            pks = db.upsert_posts_bulk(scored_posts)
+            db.upsert_sentiments_bulk(list(zip(pks, sentiments)))
+            db.upsert_embeddings_bulk([(pks[i], emb) for i, emb in zip(embed_idx, embeddings)])
+        processed_count = len(pks)
+    except Exception as e:
+        logger.warning("Failed to persist %s posts for %s: %s", len(scored_posts), symbol, e)
 
-    logger.info(f"Successfully processed {processed_count} posts for {symbol}")
+    logger.info("Successfully processed %s posts for %s", processed_count, symbol)
 
     # Aggregate results
     try:
@@ -199,12 +286,34 @@ def aggregate_social(symbol: str, window: str = "24h") -> Dict:
         result["posts_found"] = len(posts)
         result["posts_processed"] = processed_count
         result["sources"] = sources_status
-        logger.info(f"Aggregation complete for {symbol}: {processed_count} posts")
+        logger.info("Aggregation complete for %s: %s posts", symbol, processed_count)
         return result
     except Exception as e:
-        logger.error(f"Aggregation failed for {symbol}: {e}")
+        logger.error("Aggregation failed for %s: %s", symbol, e)
         raise
 
+def _embedding_indices(texts: List[str], sentiments: List[SentimentScore]) -> List[int]:
+    """
+    Pick the posts worth embedding.
+
+    Embedding is the most expensive stage and aggregation does not read it,
+    so low-confidence and very short posts are skipped.
+
+    Args:
+        texts: Normalized post texts
+        sentiments: Sentiment scores aligned with texts
+
+    Returns:
+        Indices into texts of the posts to embed
+    """
+    settings = get_settings()
+    return [
+        i for i, (t, s) in enumerate(zip(texts, sentiments))
+        if s.confidence >= settings.embed_min_confidence and len(t) >= settings.embed_min_length
+    ]
+
+# Clients send a handful of distinct windows ("24h", "7d", ...), so parse each once
+@lru_cache(maxsize=64)
 def _parse_window(window: str) -> dt.timedelta:
     """
     Parse time window string to timedelta.
@@ -216,19 +325,12 @@ def _parse_window(window: str) -> dt.timedelta:
         timedelta object
 
     Raises:
-        ValueError: If window format is invalid
+        ValueError: If window format is invalid or the window is out of range
     """
-    try:
-        n = int(window[:-1])
-        unit = window[-1].lower()
-
-        if unit == 'h':
-            return dt.timedelta(hours=n)
-        elif unit == 'd':
-            return dt.timedelta(days=n)
-        else:
-            logger.warning(f"Unknown time unit {unit}, defaulting to 24h")
-            return dt.timedelta(hours=24)
-    except (ValueError, IndexError) as e:
-        logger.error(f"Failed to parse window {window}: {e}")
+    m = _WINDOW_RE.match(window)
+    if not m:
         raise ValueError(f"Invalid window format: {window}. Use format like '24h' or '7d'.")
+    try:
+        return dt.timedelta(seconds=int(m.group(1)) * _WINDOW_UNIT_SECONDS[m.group(2).lower()])
+    except OverflowError:
+        raise ValueError(f"Window too large: {window}")
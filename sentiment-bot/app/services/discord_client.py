@@ -1,12 +1,36 @@
-from typing import List, Set
-from datetime import datetime
+from typing import Dict, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import ciso8601
 import httpx
 import logging
+import orjson
 from app.services.types import SocialPost
 from app.config import get_settings
+from app.services.http import get_http_client
 
 logger = logging.getLogger(__name__)
 
+# Channels fetched concurrently; kept small to stay within Discord's per-route rate limits
+DISCORD_CHANNEL_CONCURRENCY = 8
+
+# Discord snowflakes count milliseconds from 2015-01-01T00:00:00Z in their top 42 bits
+DISCORD_EPOCH_MS = 1420070400000
+
+def _snowflake_at(ts: datetime) -> int:
+    """
+    Smallest Discord snowflake for a message created at ts.
+
+    Args:
+        ts: Timestamp; naive values are taken as UTC
+
+    Returns:
+        Snowflake that every message created at or after ts is at least
+    """
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return max(int(ts.timestamp() * 1000) - DISCORD_EPOCH_MS, 0) << 22
+
 def collect_discord(inst: dict, since: datetime) -> List[SocialPost]:
     """
     Collect messages from Discord guilds and channels.
@@ -26,9 +50,9 @@ def collect_discord(inst: dict, since: datetime) -> List[SocialPost]:
     if not settings.discord_bot_token:
         return []
 
-    # Parse allowed guild and channel IDs from config
-    guild_ids = _parse_ids(settings.discord_guild_ids)
-    channel_allowlist = _parse_ids(settings.discord_channel_allowlist)
+    # Allowed guild and channel IDs, pre-parsed on Settings
+    guild_ids = settings.discord_guild_id_set
+    channel_allowlist = settings.discord_channel_id_set
 
     if not guild_ids:
         logger.warning("No Discord guild IDs configured")
@@ -41,145 +65,170 @@ def collect_discord(inst: dict, since: datetime) -> List[SocialPost]:
         "User-Agent": "sentiment-bot/1.0"
     }
 
-    with httpx.Client() as client:
-        # For each allowed guild, fetch allowed channels
-        for guild_id in guild_ids:
+    client = get_http_client()
+    # For each allowed guild, list allowed channels
+    channels_to_fetch: List[Tuple[int, str]] = []
+    for guild_id in guild_ids:
+        try:
+            # Get channels in guild
+            channels_url = f"https://discord.com/api/v10/guilds/{guild_id}/channels"
+
             try:
-                # Get channels in guild
-                channels_url = f"https://discord.com/api/v10/guilds/{guild_id}/channels"
-
-                try:
-                    channels_resp = client.get(
-                        channels_url,
-                        headers=headers,
-                        timeout=10.0
-                    )
-                    channels_resp.raise_for_status()
-                    channels = channels_resp.json()
-                except httpx.HTTPStatusError as e:
-                    logger.warning(f"Failed to fetch channels for guild {guild_id}: {e.response.status_code}")
+                channels_resp = client.get(
+                    channels_url,
+                    headers=headers,
+                    timeout=10.0
+                )
+                channels_resp.raise_for_status()
+                channels = orjson.loads(channels_resp.content)
+            except httpx.HTTPStatusError as e:
+                logger.warning("Failed to fetch channels for guild %s: %s", guild_id, e.response.status_code)
+                continue
+
+            # Filter to text channels in allowlist
+            for channel in channels:
+                channel_id = channel.get("id")
+                channel_type = channel.get("type")
+
+                # Type 0 = text channel
+                if channel_type != 0:
                     continue
 
-                # Filter to text channels in allowlist
-                for channel in channels:
-                    channel_id = str(channel.get("id"))
-                    channel_type = channel.get("type")
+                # Check if channel is in allowlist
+                if channel_allowlist and int(channel_id) not in channel_allowlist:
+                    continue
 
-                    # Type 0 = text channel
-                    if channel_type != 0:
-                        continue
+                channels_to_fetch.append((guild_id, channel_id))
 
-                    # Check if channel is in allowlist
-                    if channel_allowlist and channel_id not in channel_allowlist:
-                        continue
+        except Exception as e:
+            logger.error("Error processing guild %s: %s", guild_id, e)
+            continue
+
+    # Channel reads are independent and IO-bound, so fetch them concurrently
+    if channels_to_fetch:
+        with ThreadPoolExecutor(max_workers=min(DISCORD_CHANNEL_CONCURRENCY, len(channels_to_fetch))) as pool:
+            futures = [pool.submit(_fetch_channel_messages, client, headers, guild_id, channel_id, since)
+                       for guild_id, channel_id in channels_to_fetch]
+            for f in futures:
+                posts.extend(f.result())
+
+    logger.info("Retrieved %s messages from Discord", len(posts))
+    return posts
 
-                    # Fetch messages from this channel
+def _fetch_channel_messages(client: httpx.Client, headers: Dict[str, str], guild_id: int,
+                            channel_id: str, since: datetime) -> List[SocialPost]:
+    """
+    Fetch recent messages from one Discord channel.
+
+    Errors are logged and end the channel's fetch early; they never propagate.
+
+    Args:
+        client: Shared HTTP client
+        headers: Request headers, including the bot authorization
+        guild_id: Guild the channel belongs to
+        channel_id: Channel to read
+        since: Only return messages created after this datetime
+
+    Returns:
+        List of SocialPost objects from the channel
+    """
+    posts = []
+
+    try:
+        messages_url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
+        params = {
+            "limit": 100,
+        }
+        # Message IDs encode their creation time, so the window check is an integer compare
+        cutoff = _snowflake_at(since)
+        reached_cutoff = False
+
+        # Fetch up to 2 batches of messages (200 total)
+        for _ in range(2):
+            try:
+                msgs_resp = client.get(
+                    messages_url,
+                    headers=headers,
+                    params=params,
+                    timeout=10.0
+                )
+
+                if msgs_resp.status_code == 429:
+                    logger.warning("Discord API rate limited for channel %s", channel_id)
+                    break
+
+                msgs_resp.raise_for_status()
+                messages = orjson.loads(msgs_resp.content)
+
+                if not messages:
+                    break
+
+                # Process each message
+                for msg in messages:
                     try:
-                        messages_url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
-                        params = {
-                            "limit": 100,
-                        }
-
-                        # Fetch up to 2 batches of messages (200 total)
-                        for _ in range(2):
-                            try:
-                                msgs_resp = client.get(
-                                    messages_url,
-                                    headers=headers,
-                                    params=params,
-                                    timeout=10.0
-                                )
-
-                                if msgs_resp.status_code == 429:
-                                    logger.warning(f"Discord API rate limited for channel {channel_id}")
-                                    break
-
-                                msgs_resp.raise_for_status()
-                                messages = msgs_resp.json()
-
-                                if not messages:
-                                    break
-
-                                # Process each message
-                                for msg in messages:
-                                    try:
-                                        msg_id = msg.get("id")
-                                        content = msg.get("content", "")
-                                        created_at_str = msg.get("timestamp", "")
-                                        author = msg.get("author", {})
-                                        is_bot = author.get("bot", False)
-
-                                        # Skip bot messages
-                                        if is_bot:
-                                            continue
-
-                                        # Skip empty messages
-                                        if not content:
-                                            continue
-
-                                        # Parse ISO 8601 datetime
-                                        if created_at_str:
-                                            created_at = datetime.fromisoformat(
-                                                created_at_str.replace("Z", "+00:00")
-                                            )
-                                        else:
-                                            created_at = datetime.utcnow()
-
-                                        # Skip if older than window
-                                        if created_at < since:
-                                            # Messages are in descending order, so we can break here
-                                            break
-
-                                        author_id = author.get("id", "")
-                                        author_handle = author.get("username", f"user_{author_id}")
-
-                                        post = SocialPost(
-                                            source="discord",
-                                            platform_id=msg_id,
-                                            author_id=author_id,
-                                            author_handle=author_handle,
-                                            created_at=created_at,
-                                            text=content,
-                                            like_count=None,
-                                            follower_count=None,
-                                            permalink=f"https://discord.com/channels/{guild_id}/{channel_id}/{msg_id}",
-                                            lang="en"
-                                        )
-                                        posts.append(post)
-
-                                    except (KeyError, ValueError) as e:
-                                        logger.warning(f"Failed to parse Discord message: {e}")
-                                        continue
-
-                                # For pagination, use the last message ID
-                                if messages:
-                                    last_msg_id = messages[-1].get("id")
-                                    params["before"] = last_msg_id
-
-                            except httpx.HTTPStatusError as e:
-                                if e.response.status_code == 429:
-                                    logger.warning(f"Discord API rate limited")
-                                else:
-                                    logger.error(f"Discord API error for channel {channel_id}: {e.response.status_code}")
-                                break
-                            except Exception as e:
-                                logger.error(f"Error fetching Discord messages for channel {channel_id}: {e}")
-                                break
-
-                    except Exception as e:
-                        logger.error(f"Error processing channel {channel_id}: {e}")
+                        msg_id = msg.get("id")
+
+                        # Messages are newest first, so the first one before the window ends the channel
+                        if int(msg_id) < cutoff:
+                            reached_cutoff = True
+                            break
+
+                        content = msg.get("content", "")
+                        created_at_str = msg.get("timestamp", "")
+                        author = msg.get("author", {})
+                        is_bot = author.get("bot", False)
+
+                        # Skip bot messages
+                        if is_bot:
+                            continue
+
+                        # Skip empty messages
+                        if not content:
+                            continue
+
+                        # Parse ISO 8601 datetime
+                        if created_at_str:
+                            created_at = ciso8601.parse_datetime(created_at_str)
+                        else:
+                            created_at = datetime.utcnow()
+
+                        author_id = author.get("id", "")
+                        author_handle = author.get("username", f"user_{author_id}")
+
+                        post = SocialPost(
+                            source="discord",
+                            platform_id=msg_id,
+                            author_id=author_id,
+                            author_handle=author_handle,
+                            created_at=created_at,
+                            text=content,
+                            like_count=None,
+                            follower_count=None,
+                            permalink=f"https://discord.com/channels/{guild_id}/{channel_id}/{msg_id}",
+                            lang="en"
+                        )
+                        posts.append(post)
+
+                    except (KeyError, ValueError) as e:
+                        logger.warning("Failed to parse Discord message: %s", e)
                         continue
 
+                # Page backwards from the oldest message seen, unless the window is already covered
+                if reached_cutoff or len(messages) < params["limit"]:
+                    break
+                params["before"] = messages[-1].get("id")
+
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 429:
+                    logger.warning("Discord API rate limited")
+                else:
+                    logger.error("Discord API error for channel %s: %s", channel_id, e.response.status_code)
+                break
             except Exception as e:
-                logger.error(f"Error processing guild {guild_id}: {e}")
-                continue
-
-    logger.info(f"Retrieved {len(posts)} messages from Discord")
-    return posts
+                logger.error("Error fetching Discord messages for channel %s: %s", channel_id, e)
+                break
 
+    except Exception as e:
+        logger.error("Error processing channel %s: %s", channel_id, e)
 
-def _parse_ids(ids_str: str) -> Set[str]:
-    """Parse comma-separated IDs from config string."""
-    if not ids_str:
-        return set()
-    return {id.strip() for id in ids_str.split(",") if id.strip()}
+    return posts
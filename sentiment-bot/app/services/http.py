@@ -0,0 +1,31 @@
+import atexit
+from functools import lru_cache
+import httpx
+
+HTTP_TIMEOUT = 10.0
+HTTP_MAX_CONNECTIONS = 64
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 32
+
+@lru_cache(maxsize=1)
+def get_http_client() -> httpx.Client:
+    """
+    Shared HTTP client for the REST collectors.
+
+    One pooled client keeps connections alive between requests and
+    collection runs, so repeat calls to the same host skip DNS and the TLS
+    handshake. httpx.Client is safe to share across the collector threads.
+    It is closed at interpreter exit.
+
+    Returns:
+        Process-wide httpx.Client
+    """
+    client = httpx.Client(
+        timeout=HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS
+        ),
+        headers={"User-Agent": "sentiment-bot/1.0"}
+    )
+    atexit.register(client.close)
+    return client
@@ -1,6 +1,5 @@
 from typing import List
 from datetime import datetime
-import praw
 import logging
 from app.services.types import SocialPost
 from app.config import get_settings
@@ -36,6 +35,10 @@ def search_reddit_bundle(inst: dict, since: datetime) -> List[SocialPost]:
     since_timestamp = int(since.timestamp())
 
     try:
+        # Deferred: praw pulls in a large dependency tree, and most workers start
+        # without Reddit credentials configured
+        import praw
+
         # Initialize PRAW with app authentication
         reddit = praw.Reddit(
             client_id=settings.reddit_client_id,
@@ -99,24 +102,24 @@ def search_reddit_bundle(inst: dict, since: datetime) -> List[SocialPost]:
                                         )
                                         posts.append(comment_post)
                                 except Exception as e:
-                                    logger.warning(f"Failed to fetch comments for Reddit post {submission.id}: {e}")
+                                    logger.warning("Failed to fetch comments for Reddit post %s: %s", submission.id, e)
                                     continue
 
                             except Exception as e:
-                                logger.warning(f"Failed to process Reddit post: {e}")
+                                logger.warning("Failed to process Reddit post: %s", e)
                                 continue
 
                     except Exception as e:
-                        logger.warning(f"Failed to search subreddit {subreddit_name} for query '{query}': {e}")
+                        logger.warning("Failed to search subreddit %s for query '%s': %s", subreddit_name, query, e)
                         continue
 
             except Exception as e:
-                logger.warning(f"Failed to access subreddit {subreddit_name}: {e}")
+                logger.warning("Failed to access subreddit %s: %s", subreddit_name, e)
                 continue
 
     except Exception as e:
-        logger.error(f"Failed to initialize Reddit API for symbol {symbol}: {e}")
+        logger.error("Failed to initialize Reddit API for symbol %s: %s", symbol, e)
         return []
 
-    logger.info(f"Retrieved {len(posts)} posts/comments from Reddit for symbol {symbol}")
+    logger.info("Retrieved %s posts/comments from Reddit for symbol %s", len(posts), symbol)
     return posts
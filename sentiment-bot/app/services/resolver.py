@@ -1,8 +1,26 @@
 import httpx
-from typing import Optional
+import logging
+import threading
+import time
+from typing import Dict, Optional, Set, Tuple
 from app.services.types import ResolvedInstrument
+from app.storage.cache import cache_get, cache_set
 from app.storage.db import DB
 
+logger = logging.getLogger(__name__)
+
+# Matches the 7-day freshness window of the Postgres resolver_cache
+RESOLVER_CACHE_TTL = 7 * 24 * 3600
+
+# In-process layer in front of Redis and Postgres; expired entries are served
+# while a background thread re-resolves them, so lookups never wait on a refresh
+RESOLVE_LOCAL_TTL = 600
+RESOLVE_LOCAL_MAXSIZE = 8192
+
+_local_cache: Dict[str, Tuple[float, ResolvedInstrument]] = {}
+_refreshing: Set[str] = set()
+_local_lock = threading.Lock()
+
 # Simple symbol map for common tickers
 SYMBOL_MAP = {
     "APPLE": "AAPL",
@@ -15,11 +33,68 @@ SYMBOL_MAP = {
 }
 
 def resolve(query: str) -> ResolvedInstrument:
-    # Check cache first
+    """
+    Resolve a ticker or company name to an instrument.
+
+    Args:
+        query: Ticker, cashtag or company name
+
+    Returns:
+        ResolvedInstrument, possibly up to RESOLVE_LOCAL_TTL seconds stale
+    """
+    key = query.upper()
+    entry = _local_cache.get(key)
+    if entry is not None:
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            _schedule_refresh(query)
+        return result
+
+    result = _resolve_uncached(query)
+    _remember(key, result)
+    return result
+
+def _remember(key: str, result: ResolvedInstrument) -> None:
+    with _local_lock:
+        _local_cache.pop(key, None)
+        if len(_local_cache) >= RESOLVE_LOCAL_MAXSIZE:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            _local_cache.pop(next(iter(_local_cache)))
+        _local_cache[key] = (time.monotonic() + RESOLVE_LOCAL_TTL, result)
+
+def _schedule_refresh(query: str) -> None:
+    # One refresh per key at a time, so a hot symbol doesn't stampede Redis and Postgres
+    key = query.upper()
+    with _local_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    threading.Thread(target=_refresh, args=(query,), daemon=True).start()
+
+def _refresh(query: str) -> None:
+    key = query.upper()
+    try:
+        _remember(key, _resolve_uncached(query))
+    except Exception as e:
+        # Keep serving the stale entry; the next read retries the refresh
+        logger.warning("Background resolve of %s failed: %s", query, e)
+    finally:
+        with _local_lock:
+            _refreshing.discard(key)
+
+def _resolve_uncached(query: str) -> ResolvedInstrument:
+    # Check Redis, then the Postgres cache
+    redis_key = f"resolver:{query.upper()}"
+    cached = cache_get(redis_key)
+    if cached:
+        return ResolvedInstrument.model_validate_json(cached)
+
     db = DB()
     cached = db.get_cached_resolution(query.upper())
     if cached:
-        return ResolvedInstrument(**cached)
+        result = ResolvedInstrument(**cached)
+        cache_set(redis_key, result.model_dump_json(), RESOLVER_CACHE_TTL)
+        return result
 
     # Normalize query
     query_upper = query.upper().strip('$')
@@ -53,5 +128,6 @@ def resolve(query: str) -> ResolvedInstrument:
         figi=result.figi,
         company_name=result.company_name
     )
+    cache_set(redis_key, result.model_dump_json(), RESOLVER_CACHE_TTL)
 
     return result
@@ -1,7 +1,9 @@
 from typing import List, Dict, Any
 from datetime import datetime
+import ciso8601
 import httpx
 import logging
+import orjson
 from app.services.types import SocialPost
 from app.config import get_settings
 
@@ -65,12 +67,12 @@ def search_x_bundle(inst: dict, since: datetime) -> List[SocialPost]:
 
                 # Handle rate limiting
                 if response.status_code == 429:
-                    logger.warning(f"X API rate limited for symbol {symbol}")
+                    logger.warning("X API rate limited for symbol %s", symbol)
                     break
 
                 response.raise_for_status()
 
-                data = response.json()
+                data = orjson.loads(response.content)
 
                 # No tweets found
                 if "data" not in data:
@@ -92,9 +94,7 @@ def search_x_bundle(inst: dict, since: datetime) -> List[SocialPost]:
                         author_id = tweet.get("author_id", "")
 
                         # Parse ISO 8601 datetime
-                        created_at = datetime.fromisoformat(
-                            created_at_str.replace("Z", "+00:00")
-                        )
+                        created_at = ciso8601.parse_datetime(created_at_str)
 
                         user = users_by_id.get(author_id, {})
                         author_handle = user.get("username", f"user_{author_id}")
@@ -116,7 +116,7 @@ def search_x_bundle(inst: dict, since: datetime) -> List[SocialPost]:
                         )
                         posts.append(post)
                     except (KeyError, ValueError) as e:
-                        logger.warning(f"Failed to parse tweet {tweet.get('id', 'unknown')}: {e}")
+                        logger.warning("Failed to parse tweet %s: %s", tweet.get('id', 'unknown'), e)
                         continue
 
                 # Check for pagination
@@ -128,14 +128,14 @@ def search_x_bundle(inst: dict, since: datetime) -> List[SocialPost]:
 
             except httpx.HTTPStatusError as e:
                 if e.response.status_code == 429:
-                    logger.warning(f"X API rate limited for symbol {symbol}")
+                    logger.warning("X API rate limited for symbol %s", symbol)
                     break
                 else:
-                    logger.error(f"X API error for symbol {symbol}: {e.response.status_code}")
+                    logger.error("X API error for symbol %s: %s", symbol, e.response.status_code)
                     break
             except Exception as e:
-                logger.error(f"Error searching X API for symbol {symbol}: {e}")
+                logger.error("Error searching X API for symbol %s: %s", symbol, e)
                 break
 
-    logger.info(f"Retrieved {len(posts)} posts from X for symbol {symbol}")
+    logger.info("Retrieved %s posts from X for symbol %s", len(posts), symbol)
     return posts
@@ -0,0 +1,73 @@
+import logging
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# After a Redis error, skip Redis for this many seconds instead of timing out on every call
+REDIS_BACKOFF_SECONDS = 30.0
+
+_redis_down_until = 0.0
+
+@lru_cache(maxsize=1)
+def get_redis():
+    """Process-wide Redis client; redis-py manages the underlying connection pool."""
+    import redis
+
+    settings = get_settings()
+    return redis.Redis.from_url(
+        settings.redis_url,
+        socket_connect_timeout=0.5,
+        socket_timeout=0.5,
+    )
+
+def _redis_available() -> bool:
+    return time.monotonic() >= _redis_down_until
+
+def _mark_redis_down(op: str, key: str, e: Exception) -> None:
+    global _redis_down_until
+    _redis_down_until = time.monotonic() + REDIS_BACKOFF_SECONDS
+    logger.warning("Redis %s failed for %s: %s; bypassing Redis for %.0fs", op, key, e, REDIS_BACKOFF_SECONDS)
+
+def cache_get(key: str):
+    """Return the cached bytes for key, or None on a miss or Redis error."""
+    if not _redis_available():
+        return None
+    try:
+        return get_redis().get(key)
+    except Exception as e:
+        _mark_redis_down("GET", key, e)
+        return None
+
+def cache_set(key: str, value, ttl: int) -> None:
+    """SETEX key; Redis errors are logged and ignored."""
+    if not _redis_available():
+        return
+    try:
+        get_redis().setex(key, ttl, value)
+    except Exception as e:
+        _mark_redis_down("SETEX", key, e)
+
+def cache_get_many(keys: List[str]) -> List[Optional[bytes]]:
+    """MGET keys in one round-trip; all misses on Redis error."""
+    if not keys or not _redis_available():
+        return [None] * len(keys)
+    try:
+        return get_redis().mget(keys)
+    except Exception as e:
+        _mark_redis_down("MGET", f"{len(keys)} keys", e)
+        return [None] * len(keys)
+
+def cache_set_many(items: Dict[str, bytes], ttl: int) -> None:
+    """SETEX every item in one pipelined round-trip; Redis errors are logged and ignored."""
+    if not items or not _redis_available():
+        return
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.setex(key, ttl, value)
+        pipe.execute()
+    except Exception as e:
+        _mark_redis_down("SETEX", f"{len(items)} keys", e)
@@ -1,103 +1,209 @@
 import os
-import psycopg
-import numpy as np
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, List, Dict, Tuple
 from app.services.types import SocialPost, SentimentScore
 from app.config import get_settings
 
-class DB:
-    def __init__(self):
-        settings = get_settings()
-        self.conn = psycopg.connect(settings.database_url, autocommit=True)
-        self._init_schema()
+if TYPE_CHECKING:
+    import numpy as np
+
+# Rows per executemany() call; psycopg pipelines each batch into a single round-trip
+BULK_BATCH_SIZE = 1000
+
+_POST_UPSERT_SQL = """
+    INSERT INTO social_posts
+    (source, platform_id, author_id, created_at, text, symbols, urls, lang,
+     reply_to_id, repost_of_id, like_count, reply_count, repost_count,
+     follower_count, permalink)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (source, platform_id) DO UPDATE SET ingested_at = NOW()
+    RETURNING id
+"""
+
+_SENTIMENT_UPSERT_SQL = """
+    INSERT INTO sentiment (post_pk, polarity, subjectivity, sarcasm_prob, confidence, model)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    ON CONFLICT (post_pk) DO UPDATE SET
+        polarity = EXCLUDED.polarity,
+        subjectivity = EXCLUDED.subjectivity,
+        sarcasm_prob = EXCLUDED.sarcasm_prob,
+        confidence = EXCLUDED.confidence,
+        model = EXCLUDED.model
+"""
+
+_EMBEDDING_UPSERT_SQL = """
+    INSERT INTO post_embeddings (post_pk, emb)
+    VALUES (%s, %s)
+    ON CONFLICT (post_pk) DO UPDATE SET emb = EXCLUDED.emb
+"""
+
+def _post_row(p: SocialPost) -> tuple:
+    return (
+        p.source, p.platform_id, p.author_id, p.created_at, p.text,
+        p.symbols, p.urls, p.lang, p.reply_to_id, p.repost_of_id,
+        p.like_count, p.reply_count, p.repost_count, p.follower_count, p.permalink
+    )
+
+def _sentiment_row(pk: int, s: SentimentScore) -> tuple:
+    return (pk, s.polarity, s.subjectivity, s.sarcasm_prob, s.confidence, s.model)
+
+def _embedding_row(pk: int, emb: "np.ndarray") -> tuple:
+    from pgvector import HalfVector
+
+    # halfvec stores FP16, half the bytes of a float32 vector on the wire and on disk
+    return (pk, HalfVector(emb))
+
+def _batches(rows: List[tuple], size: int = BULK_BATCH_SIZE):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+_schema_lock = threading.Lock()
+_schema_ready = threading.Event()
+
+def ensure_schema(conninfo: str) -> None:
+    """Apply schemas.sql once per process."""
+    if _schema_ready.is_set():
+        return
+    with _schema_lock:
+        if _schema_ready.is_set():
+            return
+        import psycopg
 
-    def _init_schema(self):
         schema_path = os.path.join(os.path.dirname(__file__), "schemas.sql")
         with open(schema_path) as f:
-            with self.conn.cursor() as c:
-                c.execute(f.read())
+            # Plain connection: pooled ones register pgvector types, which needs the extension first
+            with psycopg.connect(conninfo, autocommit=True) as conn:
+                conn.execute(f.read())
+        _schema_ready.set()
+
+def _configure_connection(conn) -> None:
+    from pgvector.psycopg import register_vector
+
+    register_vector(conn)
+
+@lru_cache(maxsize=1)
+def get_pool():
+    """Process-wide connection pool, created on first use."""
+    # Imported here so `import app.main` doesn't pay for libpq until a DB is needed
+    from psycopg_pool import ConnectionPool
+
+    settings = get_settings()
+    ensure_schema(settings.database_url)
+    # No per-checkout health check: recycling connections by age is the cheap way
+    # to shed stale ones, and a broken connection is discarded when returned
+    return ConnectionPool(
+        settings.database_url,
+        min_size=settings.db_pool_min_size,
+        max_size=settings.db_pool_max_size,
+        max_lifetime=settings.db_pool_max_lifetime,
+        kwargs={"autocommit": True},
+        configure=_configure_connection,
+        open=True,
+    )
+
+class DB:
+    def __init__(self):
+        self.pool = get_pool()
+        self._conn = None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run the enclosed calls on one connection inside a single transaction.
+
+        Pooled connections autocommit, so without this each write commits on
+        its own; here they commit together or roll back together on error.
+        """
+        if self._conn is not None:
+            yield
+            return
+        with self.pool.connection() as conn:
+            with conn.transaction():
+                self._conn = conn
+                try:
+                    yield
+                finally:
+                    self._conn = None
+
+    @contextmanager
+    def _cursor(self):
+        if self._conn is not None:
+            with self._conn.cursor() as c:
+                yield c
+            return
+        with self.pool.connection() as conn:
+            with conn.cursor() as c:
+                yield c
 
     def upsert_post(self, p: SocialPost) -> int:
-        with self.conn.cursor() as c:
-            c.execute("""
-                INSERT INTO social_posts
-                (source, platform_id, author_id, created_at, text, symbols, urls, lang,
-                 reply_to_id, repost_of_id, like_count, reply_count, repost_count,
-                 follower_count, permalink)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                ON CONFLICT (source, platform_id) DO UPDATE SET ingested_at = NOW()
-                RETURNING id
-            """, (
-                p.source, p.platform_id, p.author_id, p.created_at, p.text,
-                p.symbols, p.urls, p.lang, p.reply_to_id, p.repost_of_id,
-                p.like_count, p.reply_count, p.repost_count, p.follower_count, p.permalink
-            ))
+        with self._cursor() as c:
+            c.execute(_POST_UPSERT_SQL, _post_row(p))
             return c.fetchone()[0]
 
     def upsert_sentiment(self, pk: int, s: SentimentScore) -> None:
-        with self.conn.cursor() as c:
-            c.execute("""
-                INSERT INTO sentiment (post_pk, polarity, subjectivity, sarcasm_prob, confidence, model)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON CONFLICT (post_pk) DO UPDATE SET
-                    polarity = EXCLUDED.polarity,
-                    subjectivity = EXCLUDED.subjectivity,
-                    sarcasm_prob = EXCLUDED.sarcasm_prob,
-                    confidence = EXCLUDED.confidence,
-                    model = EXCLUDED.model
-            """, (pk, s.polarity, s.subjectivity, s.sarcasm_prob, s.confidence, s.model))
-
-    def upsert_embedding(self, pk: int, emb: np.ndarray) -> None:
-        with self.conn.cursor() as c:
-            c.execute("""
-                INSERT INTO post_embeddings (post_pk, emb)
-                VALUES (%s, %s)
-                ON CONFLICT (post_pk) DO UPDATE SET emb = EXCLUDED.emb
-            """, (pk, emb.tobytes()))
+        with self._cursor() as c:
+            c.execute(_SENTIMENT_UPSERT_SQL, _sentiment_row(pk, s))
+
+    def upsert_embedding(self, pk: int, emb: "np.ndarray") -> None:
+        with self._cursor() as c:
+            c.execute(_EMBEDDING_UPSERT_SQL, _embedding_row(pk, emb))
+
+    def upsert_posts_bulk(self, posts: List[SocialPost]) -> List[int]:
+        """Upsert posts in batches, returning primary keys aligned with ``posts``."""
+        pks: List[int] = []
+        with self._cursor() as c:
+            for batch in _batches([_post_row(p) for p in posts]):
+                c.executemany(_POST_UPSERT_SQL, batch, returning=True)
+                while True:
+                    pks.append(c.fetchone()[0])
+                    if not c.nextset():
+                        break
+        return pks
+
+    def upsert_sentiments_bulk(self, pairs: List[Tuple[int, SentimentScore]]) -> None:
+        with self._cursor() as c:
+            for batch in _batches([_sentiment_row(pk, s) for pk, s in pairs]):
+                c.executemany(_SENTIMENT_UPSERT_SQL, batch)
+
+    def upsert_embeddings_bulk(self, pairs: List[Tuple[int, "np.ndarray"]]) -> None:
+        with self._cursor() as c:
+            for batch in _batches([_embedding_row(pk, emb) for pk, emb in pairs]):
+                c.executemany(_EMBEDDING_UPSERT_SQL, batch)
 
     def aggregate(self, symbol: str, since: datetime) -> Dict:
-        with self.conn.cursor() as c:
+        with self._cursor() as c:
+            # symbols @> ARRAY[...] (unlike = ANY) can use the GIN index on symbols
             c.execute("""
+                WITH per_source AS (
+                    SELECT p.source, COUNT(*) AS cnt, SUM(s.polarity) AS polarity_sum
+                    FROM social_posts p
+                    JOIN sentiment s ON s.post_pk = p.id
+                    WHERE p.symbols @> ARRAY[%s]::text[] AND p.created_at >= %s
+                    GROUP BY p.source
+                )
                 SELECT
-                    COUNT(*) as count,
-                    AVG(s.polarity) as avg_polarity,
-                    STDDEV(s.polarity) as stddev_polarity,
-                    p.source,
-                    COUNT(*) as source_count
-                FROM social_posts p
-                JOIN sentiment s ON s.post_pk = p.id
-                WHERE %s = ANY(p.symbols) AND p.created_at >= %s
-                GROUP BY p.source
+                    COALESCE(SUM(cnt), 0) AS total_count,
+                    COALESCE(SUM(polarity_sum) / NULLIF(SUM(cnt), 0), 0.0) AS weighted_sentiment,
+                    COALESCE(jsonb_object_agg(source, cnt), '{}'::jsonb) AS sources
+                FROM per_source
             """, (symbol, since))
 
-            results = c.fetchall()
-
-            if not results:
-                return {
-                    "symbol": symbol,
-                    "window_since": since.isoformat(),
-                    "count": 0,
-                    "weighted_sentiment": 0.0,
-                    "sources": {}
-                }
-
-            total_count = sum(r[4] for r in results)
-            total_polarity = sum(r[1] * r[4] if r[1] else 0 for r in results)
-
-            source_breakdown = {r[3]: r[4] for r in results}
+            total_count, weighted_sentiment, sources = c.fetchone()
 
             return {
                 "symbol": symbol,
                 "window_since": since.isoformat(),
-                "count": total_count,
-                "weighted_sentiment": total_polarity / total_count if total_count > 0 else 0.0,
-                "sources": source_breakdown
+                "count": int(total_count),
+                "weighted_sentiment": float(weighted_sentiment),
+                "sources": sources
             }
 
     def cache_resolution(self, query: str, symbol: str, cik: Optional[str],
                         isin: Optional[str], figi: Optional[str], company_name: str):
-        with self.conn.cursor() as c:
+        with self._cursor() as c:
             c.execute("""
                 INSERT INTO resolver_cache (query, symbol, cik, isin, figi, company_name)
                 VALUES (%s, %s, %s, %s, %s, %s)
@@ -111,7 +217,7 @@ class DB:
             """, (query, symbol, cik, isin, figi, company_name))
 
     def get_cached_resolution(self, query: str) -> Optional[Dict]:
-        with self.conn.cursor() as c:
+        with self._cursor() as c:
             c.execute("""
                 SELECT symbol, cik, isin, figi, company_name
                 FROM resolver_cache
@@ -32,9 +32,25 @@ CREATE TABLE IF NOT EXISTS social_posts (
 
 CREATE TABLE IF NOT EXISTS post_embeddings (
     post_pk BIGINT PRIMARY KEY REFERENCES social_posts(id) ON DELETE CASCADE,
-    emb VECTOR(768)
+    emb HALFVEC(384)
 );
 
+-- Older schemas declared VECTOR(768) and were written with raw float32 bytes,
+-- so there is nothing salvageable to cast. They also created the symbols GIN
+-- index with fastupdate on; new databases get it off from CREATE INDEX below.
+DO $$
+BEGIN
+    IF (SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+        WHERE attrelid = 'post_embeddings'::regclass AND attname = 'emb') <> 'halfvec(384)' THEN
+        ALTER TABLE post_embeddings ALTER COLUMN emb TYPE HALFVEC(384) USING NULL;
+    END IF;
+    IF EXISTS (SELECT 1 FROM pg_class
+               WHERE oid = to_regclass('idx_social_posts_symbols')
+               AND NOT COALESCE(reloptions, '{}') @> ARRAY['fastupdate=off']) THEN
+        ALTER INDEX idx_social_posts_symbols SET (fastupdate = off);
+    END IF;
+END $$;
+
 CREATE TABLE IF NOT EXISTS sentiment (
     post_pk BIGINT PRIMARY KEY REFERENCES social_posts(id) ON DELETE CASCADE,
     polarity REAL,
@@ -54,6 +70,6 @@ CREATE TABLE IF NOT EXISTS resolver_cache (
     cached_at TIMESTAMPTZ DEFAULT NOW()
 );
 
-CREATE INDEX IF NOT EXISTS idx_social_posts_symbols ON social_posts USING GIN (symbols);
+CREATE INDEX IF NOT EXISTS idx_social_posts_symbols ON social_posts USING GIN (symbols) WITH (fastupdate = off);
 CREATE INDEX IF NOT EXISTS idx_social_posts_created ON social_posts (created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_social_posts_source_created ON social_posts (source, created_at DESC);
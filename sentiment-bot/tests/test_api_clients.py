@@ -1,7 +1,10 @@
 """Tests for external API client integrations (with mocked responses)."""
+import json
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
 import responses
+from app.services.discord_client import _snowflake_at, collect_discord
 from app.services.x_client import search_x_bundle
 from app.services.stocktwits_client import collect_stocktwits
 
@@ -177,3 +180,57 @@ def test_api_client_missing_credentials():
         since = datetime.utcnow() - timedelta(days=1)
         result = search_x_bundle({"symbol": "AAPL"}, since)
         assert result == []
+
+def test_discord_fetches_allowed_channels():
+    """Test Discord collection reads every allowed text channel, newest first, down to the window start."""
+    since = datetime(2025, 1, 14, tzinfo=timezone.utc)
+    in_window = _snowflake_at(datetime(2025, 1, 15, 10, tzinfo=timezone.utc))
+    before_window = _snowflake_at(datetime(2025, 1, 13, tzinfo=timezone.utc))
+    message_requests = []
+
+    def fake_get(url, **kwargs):
+        resp = MagicMock(status_code=200)
+        if url.endswith("/guilds/1/channels"):
+            body = [{"id": "10", "type": 0}, {"id": "11", "type": 2}, {"id": "12", "type": 0}]
+        elif url.endswith("/guilds/2/channels"):
+            body = [{"id": "20", "type": 0}]
+        else:
+            channel_id = int(url.split("/")[-2])
+            message_requests.append((channel_id, dict(kwargs["params"])))
+            body = [
+                {
+                    "id": str(in_window + channel_id),
+                    "content": f"$AAPL from {channel_id}",
+                    "timestamp": "2025-01-15T10:00:00Z",
+                    "author": {"id": "u1", "username": "trader"}
+                },
+                {
+                    "id": str(before_window + channel_id),
+                    "content": "$AAPL old news",
+                    "timestamp": "2025-01-13T00:00:00Z",
+                    "author": {"id": "u1", "username": "trader"}
+                }
+            ]
+        resp.content = json.dumps(body).encode()
+        return resp
+
+    with patch("app.services.discord_client.get_settings") as mock_settings, \
+            patch("app.services.discord_client.get_http_client") as mock_client:
+        mock_settings.return_value.discord_bot_token = "token"
+        mock_settings.return_value.discord_guild_id_set = frozenset({1, 2})
+        mock_settings.return_value.discord_channel_id_set = frozenset()
+        mock_client.return_value.get.side_effect = fake_get
+
+        result = collect_discord({"symbol": "AAPL"}, since)
+
+    assert sorted(p.platform_id for p in result) == [str(in_window + c) for c in (10, 12, 20)]
+    assert all(p.source == "discord" for p in result)
+    # Reaching a message older than the window stops paging: one newest-first request per channel
+    assert sorted(message_requests) == [(c, {"limit": 100}) for c in (10, 12, 20)]
+
+def test_discord_snowflake_at():
+    """Test timestamps convert to the snowflake Discord would assign at that instant."""
+    # Example from Discord's API reference: 175928847299117063 was created at 2016-04-30 11:18:25.796 UTC
+    created = datetime(2016, 4, 30, 11, 18, 25, 796000, tzinfo=timezone.utc)
+    assert _snowflake_at(created) == (175928847299117063 >> 22) << 22
+    assert _snowflake_at(created.replace(tzinfo=None)) == _snowflake_at(created)
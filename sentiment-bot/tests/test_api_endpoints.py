@@ -1,7 +1,12 @@
 """Tests for FastAPI endpoints."""
+import asyncio
+import logging
+import orjson
 import pytest
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
-from app.main import app
+from app import main
+from app.main import app, LOG_BUFFER_SIZE, _BufferedFdHandler, _console_handler
 
 client = TestClient(app)
 
@@ -67,3 +72,98 @@ def test_openapi_json():
     data = response.json()
     assert "openapi" in data
     assert "paths" in data
+
+def test_query_endpoint_caches_results():
+    """Test repeated queries for the same symbol and window reuse the result."""
+    main._query_cache.clear()
+    payload = {"symbol": "AAPL", "posts_found": 0}
+    with patch("app.main.aggregate_social_async", new=AsyncMock(return_value=payload)) as mock_agg:
+        first = client.get("/query?symbol=aapl&window=24h")
+        second = client.get("/query?symbol=AAPL&window=24h")
+
+    assert first.json() == second.json() == payload
+    mock_agg.assert_awaited_once()
+    main._query_cache.clear()
+
+def test_query_endpoint_does_not_cache_errors():
+    """Test error results such as "No posts found" are recomputed on the next request."""
+    main._query_cache.clear()
+    payload = {"symbol": "AAPL", "posts_found": 0, "error": "No posts found"}
+    with patch("app.main.aggregate_social_async", new=AsyncMock(return_value=payload)) as mock_agg:
+        client.get("/query?symbol=AAPL&window=24h")
+        client.get("/query?symbol=AAPL&window=24h")
+
+    assert mock_agg.await_count == 2
+    assert not main._query_cache
+
+def test_query_cache_is_not_shared_with_callers():
+    """Test mutating a returned result does not change what later hits are served."""
+    main._query_cache.clear()
+    payload = {"symbol": "AAPL", "posts_found": 3}
+    with patch("app.main.aggregate_social_async", new=AsyncMock(return_value=payload)):
+        client.get("/query?symbol=AAPL&window=24h")
+        payload["posts_found"] = 0
+        second = client.get("/query?symbol=AAPL&window=24h")
+
+    assert second.json()["posts_found"] == 3
+    main._query_cache.clear()
+
+def test_query_concurrent_misses_share_one_aggregation():
+    """Test concurrent cache misses for one key run the aggregation once."""
+    main._query_cache.clear()
+    calls = []
+
+    async def slow_aggregate(symbol, window):
+        calls.append(symbol)
+        await asyncio.sleep(0.01)
+        return {"symbol": symbol}
+
+    async def run():
+        return await asyncio.gather(*(main.query_sentiment("AAPL", "24h") for _ in range(3)))
+
+    with patch("app.main.aggregate_social_async", new=slow_aggregate):
+        results = asyncio.run(run())
+
+    assert [orjson.loads(r.body) for r in results] == [{"symbol": "AAPL"}] * 3
+    assert calls == ["AAPL"]
+    assert not main._query_inflight
+    main._query_cache.clear()
+
+def test_query_endpoint_normalizes_window_case():
+    """Test window units are accepted in either case and passed on lower-cased."""
+    main._query_cache.clear()
+    with patch("app.main.aggregate_social_async", new=AsyncMock(return_value={"symbol": "AAPL"})) as mock_agg:
+        response = client.get("/query?symbol=AAPL&window=7D")
+
+    assert response.status_code == 200
+    mock_agg.assert_awaited_once_with("AAPL", "7d")
+    main._query_cache.clear()
+
+def test_query_endpoint_oversized_window():
+    """Test a well-formed but out-of-range window is rejected, not a server error."""
+    response = client.get("/query?symbol=AAPL&window=99999999999999999999d")
+    assert response.status_code == 422
+
+def test_console_handler_respects_redirected_stderr(capsys):
+    """Test logs go through a redirected sys.stderr instead of the raw descriptor."""
+    handler = _console_handler()
+    assert type(handler) is logging.StreamHandler
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.emit(logging.makeLogRecord({"msg": "captured line"}))
+    assert "captured line" in capsys.readouterr().err
+
+def test_buffered_fd_handler_writes_whole_records_within_pipe_buf():
+    """Test each write holds whole records and stays within one atomic pipe write."""
+    writes = []
+    handler = _BufferedFdHandler(2)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    lines = [f"record {i:04d} " + "x" * 40 for i in range(300)] + ["y" * (LOG_BUFFER_SIZE + 10)]
+
+    with patch("app.main.os.write", side_effect=lambda fd, data: writes.append(bytes(data)) or len(data)):
+        for line in lines:
+            handler.handle(logging.makeLogRecord({"msg": line}))
+        handler.flush()
+
+    assert b"".join(writes) == "".join(line + "\n" for line in lines).encode()
+    assert all(w.endswith(b"\n") for w in writes)
+    assert all(len(w) <= LOG_BUFFER_SIZE for w in writes[:-1])
@@ -0,0 +1,74 @@
+"""Tests for text memoization."""
+import numpy as np
+import pytest
+from unittest.mock import MagicMock, patch
+from app.nlp.cache import (
+    decode_embedding, decode_sentiment, encode_embedding, encode_sentiment, memoize_texts, text_key
+)
+from app.services.types import SentimentScore
+
+def _memoize(fn, **kwargs):
+    return memoize_texts("test", fn, lambda s: s.encode(), bytes.decode, **kwargs)
+
+def test_text_key_stable():
+    """Test keys are namespaced and deterministic."""
+    assert text_key("sentiment", "abc") == text_key("sentiment", "abc")
+    assert text_key("sentiment", "abc").startswith("sentiment:")
+    assert text_key("sentiment", "abc") != text_key("embedding", "abc")
+
+def test_memoize_texts_dedupes_and_caches():
+    """Test duplicate texts are computed once and reused across calls."""
+    fn = MagicMock(side_effect=lambda texts: [t.upper() for t in texts])
+    with patch("app.nlp.cache.cache_get_many", side_effect=lambda keys: [None] * len(keys)), \
+         patch("app.nlp.cache.cache_set_many") as mock_set:
+        memoized = _memoize(fn)
+        assert memoized(["a", "b", "a"]) == ["A", "B", "A"]
+        assert memoized(["b", "c"]) == ["B", "C"]
+
+    assert [c.args[0] for c in fn.call_args_list] == [["a", "b"], ["c"]]
+    assert mock_set.call_count == 2
+
+def test_memoize_texts_uses_redis_hits():
+    """Test Redis hits are not recomputed."""
+    fn = MagicMock(side_effect=lambda texts: [t.upper() for t in texts])
+    with patch("app.nlp.cache.cache_get_many", return_value=[b"cached", None]), \
+         patch("app.nlp.cache.cache_set_many"):
+        memoized = _memoize(fn)
+        assert memoized(["hit", "miss"]) == ["cached", "MISS"]
+    fn.assert_called_once_with(["miss"])
+
+def test_memoize_texts_evicts_oldest():
+    """Test the in-process cache is bounded."""
+    fn = MagicMock(side_effect=lambda texts: list(texts))
+    with patch("app.nlp.cache.cache_get_many", side_effect=lambda keys: [None] * len(keys)), \
+         patch("app.nlp.cache.cache_set_many"):
+        memoized = _memoize(fn, maxsize=2)
+        memoized(["a", "b", "c"])
+        memoized(["a"])
+    assert fn.call_count == 2
+
+def test_memoize_texts_skips_uncacheable_results():
+    """Test results encoded as None are returned but cached in neither layer."""
+    fn = MagicMock(side_effect=lambda texts: [t.upper() for t in texts])
+    with patch("app.nlp.cache.cache_get_many", side_effect=lambda keys: [None] * len(keys)), \
+         patch("app.nlp.cache.cache_set_many") as mock_set:
+        memoized = memoize_texts("test", fn, lambda s: None if s == "FALLBACK" else s.encode(), bytes.decode)
+        assert memoized(["fallback", "ok"]) == ["FALLBACK", "OK"]
+        assert memoized(["fallback", "ok"]) == ["FALLBACK", "OK"]
+
+    assert [c.args[0] for c in fn.call_args_list] == [["fallback", "ok"], ["fallback"]]
+    assert list(mock_set.call_args_list[0].args[0]) == [text_key("test", "ok")]
+
+def test_sentiment_codec_round_trip_finbert_only():
+    """Test FinBERT scores round-trip as JSON and heuristic scores are not cached."""
+    score = SentimentScore(polarity=0.4, subjectivity=0.5, sarcasm_prob=0.05, confidence=0.9, model="finbert")
+    assert decode_sentiment(encode_sentiment(score)) == score
+    assert encode_sentiment(score.model_copy(update={"model": "heuristic"})) is None
+
+def test_embedding_codec_round_trip():
+    """Test embeddings round-trip as raw float32 and malformed bytes are rejected."""
+    row = np.linspace(-1, 1, 384, dtype=np.float32)
+    assert np.array_equal(decode_embedding(encode_embedding(row)), row)
+    assert encode_embedding(None) is None
+    with pytest.raises(ValueError):
+        decode_embedding(b"\x00" * 10)
@@ -0,0 +1,59 @@
+"""Tests for settings loading."""
+import pytest
+from dataclasses import FrozenInstanceError
+from app.config import _load
+
+def test_load_defaults(tmp_path, monkeypatch):
+    """Test defaults apply when neither .env nor environment set a value."""
+    monkeypatch.delenv("DRY_RUN", raising=False)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    settings = _load(str(tmp_path / "missing.env"))
+    assert settings.dry_run is False
+    assert settings.redis_url == "redis://localhost:6379/0"
+
+def test_load_env_file_and_environment(tmp_path, monkeypatch):
+    """Test .env values are read and the process environment overrides them."""
+    env_file = tmp_path / ".env"
+    env_file.write_text("X_BEARER_TOKEN=from-file\nDRY_RUN=true\nREDDIT_USER_AGENT=file-agent\n")
+    monkeypatch.delenv("DRY_RUN", raising=False)
+    monkeypatch.delenv("X_BEARER_TOKEN", raising=False)
+    monkeypatch.setenv("REDDIT_USER_AGENT", "env-agent")
+
+    settings = _load(str(env_file))
+
+    assert settings.x_bearer_token == "from-file"
+    assert settings.dry_run is True
+    assert settings.reddit_user_agent == "env-agent"
+
+def test_settings_frozen(tmp_path):
+    """Test settings cannot be mutated after load."""
+    settings = _load(str(tmp_path / "missing.env"))
+    with pytest.raises(FrozenInstanceError):
+        settings.dry_run = True
+
+def test_discord_ids_parsed_once(tmp_path, monkeypatch):
+    """Test Discord ID lists are parsed into integer sets at load."""
+    monkeypatch.setenv("DISCORD_GUILD_IDS", "123, 456,,")
+    monkeypatch.setenv("DISCORD_CHANNEL_ALLOWLIST", "789,not-an-id")
+    settings = _load(str(tmp_path / "missing.env"))
+    assert settings.discord_guild_id_set == frozenset({123, 456})
+    assert settings.discord_channel_id_set == frozenset({789})
+
+def test_int_settings_parsed(tmp_path, monkeypatch):
+    """Test integer settings are converted from their string form."""
+    monkeypatch.setenv("DB_POOL_MAX_SIZE", "8")
+    settings = _load(str(tmp_path / "missing.env"))
+    assert settings.db_pool_max_size == 8
+
+def test_float_settings_parsed(tmp_path, monkeypatch):
+    """Test float settings are converted from their string form."""
+    monkeypatch.setenv("EMBED_MIN_CONFIDENCE", "0.25")
+    assert _load(str(tmp_path / "missing.env")).embed_min_confidence == 0.25
+
+def test_cors_origins_parsed(tmp_path, monkeypatch):
+    """Test CORS origins are split once, and an empty value disables them."""
+    monkeypatch.setenv("CORS_ORIGINS", "https://a.example, https://b.example")
+    assert _load(str(tmp_path / "missing.env")).cors_origin_list == ("https://a.example", "https://b.example")
+
+    monkeypatch.setenv("CORS_ORIGINS", "")
+    assert _load(str(tmp_path / "missing.env")).cors_origin_list == ()
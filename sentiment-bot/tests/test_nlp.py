@@ -1,9 +1,13 @@
 """Tests for NLP functions: sentiment, embeddings, cleaning."""
 import pytest
-from app.nlp.sentiment import score_text, _detect_sarcasm
-from app.nlp.embeddings import compute_embedding, _hash_based_embedding
+from app.nlp.sentiment import (
+    score_text, score_texts, _compile, _detect_sarcasm, _finbert_scores, _keyword_hits,
+    _keyword_hits_batch, _score_text_heuristic
+)
+from app.nlp.embeddings import compute_embedding, compute_embeddings, model_embeddings, _hash_based_embedding
 from app.nlp.clean import normalize_post, extract_symbols
 import numpy as np
+from unittest.mock import MagicMock, patch
 
 class TestSentiment:
     """Test sentiment scoring."""
@@ -38,6 +42,40 @@ class TestSentiment:
         # Should be negative or fallback to heuristic
         assert result.polarity < 0.0 or result.model == "heuristic"
 
+    def test_score_texts_aligned_with_input(self):
+        """Test batch scoring returns one score per text, in order."""
+        texts = ["This is great, bullish", "terrible crash", "neutral words"]
+        results = score_texts(texts)
+        assert len(results) == 3
+        # Padding within a model batch can shift logits in the last few bits
+        assert [r.polarity for r in results] == pytest.approx([score_text(t).polarity for t in texts], abs=1e-4)
+
+    def test_compile_falls_back_when_warmup_fails(self):
+        """Test a model whose compiled forward pass fails is replaced by the eager one."""
+        torch = MagicMock()
+        torch.compile.return_value.side_effect = RuntimeError("inductor backend failed")
+        model, tokenizer = MagicMock(), MagicMock()
+
+        with patch.dict("sys.modules", {"torch": torch}):
+            assert _compile(model, tokenizer) is model
+
+        torch.compile.return_value.assert_called_once()
+
+    def test_finbert_scores_from_columns(self):
+        """Test FinBERT score columns map to one score per text."""
+        hits = [frozenset(), frozenset({"lol"})]
+        results = _finbert_scores(["bullish", "bearish lol"], hits, [0.6, -0.5], [0.7, 0.6], [0.8, 0.7])
+        assert [r.polarity for r in results] == [0.6, -0.5]
+        assert [r.confidence for r in results] == [0.7, 0.6]
+        assert [r.subjectivity for r in results] == [0.8, 0.7]
+        assert [r.sarcasm_prob for r in results] == [0.05, 0.3]
+        assert all(r.model == "finbert" for r in results)
+
+    def test_keyword_hits_batch_matches_per_text(self):
+        """Test one scan over joined texts attributes hits to the right text."""
+        texts = ["Bullish moon", "", "yeah right, crash", "nothing"]
+        assert _keyword_hits_batch(texts) == [_keyword_hits(t) for t in texts]
+
     def test_sarcasm_detection(self):
         """Test sarcasm detection."""
         sarcasm_prob = _detect_sarcasm("yeah right, sure that'll happen")
@@ -48,6 +86,18 @@ class TestSentiment:
         sarcasm_prob = _detect_sarcasm("This is a normal sentence")
         assert sarcasm_prob < 0.2
 
+    def test_heuristic_matches_whole_words_only(self):
+        """Test keywords inside longer words are not counted."""
+        result = _score_text_heuristic("Analysts upgrade along with pressure")
+        assert result.polarity == 0.0
+        assert result.sarcasm_prob < 0.2
+
+    def test_heuristic_is_case_insensitive(self):
+        """Test keyword matching ignores case without lower-casing the text."""
+        result = _score_text_heuristic("BULLISH on this, Yeah Right")
+        assert result.polarity == 1.0
+        assert result.sarcasm_prob >= 0.8
+
 
 class TestEmbeddings:
     """Test text embedding generation."""
@@ -82,6 +132,24 @@ class TestEmbeddings:
         # Should not be identical
         assert not np.allclose(emb1, emb2)
 
+    def test_compute_embeddings_batch(self):
+        """Test batch embeddings stack one normalized row per text."""
+        result = compute_embeddings(["text one", "text two"])
+        assert result.shape[0] == 2
+        assert np.allclose(np.linalg.norm(result, axis=1), 1.0, atol=0.01)
+        assert np.allclose(result[0], compute_embedding("text one"), atol=1e-5)
+
+    def test_model_embeddings_never_fall_back(self):
+        """Test model-only embeddings are independent row copies, or None without a model."""
+        with patch("app.nlp.embeddings._get_embedding_model", return_value=None):
+            assert model_embeddings(["text one", "text two"]) == [None, None]
+
+        model = MagicMock()
+        model.encode.return_value = np.ones((2, 384), dtype=np.float32)
+        with patch("app.nlp.embeddings._get_embedding_model", return_value=model):
+            rows = model_embeddings(["text one", "text two"])
+        assert all(row.base is None for row in rows)
+
     def test_hash_based_embedding_fallback(self):
         """Test fallback hash-based embedding."""
         result = _hash_based_embedding("test")
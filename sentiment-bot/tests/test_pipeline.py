@@ -1,8 +1,12 @@
 """Tests for the orchestration pipeline."""
+import asyncio
 import pytest
 from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
-from app.orchestration.tasks import aggregate_social, _parse_window, healthcheck
+from app.orchestration.tasks import (
+    aggregate_social, aggregate_social_async, _embedding_indices, _parse_window, healthcheck
+)
+from app.services.types import SentimentScore
 
 def test_parse_window_hours():
     """Test time window parsing for hours."""
@@ -19,10 +23,14 @@ def test_parse_window_invalid():
     with pytest.raises(ValueError):
         _parse_window("invalid")
 
-def test_parse_window_default():
-    """Test default fallback for malformed window."""
-    result = _parse_window("xyz")
-    assert result.total_seconds() == 24 * 3600  # Should default to 24h
+def test_parse_window_unknown_unit():
+    """Test unknown units are rejected rather than silently defaulting."""
+    with pytest.raises(ValueError):
+        _parse_window("24x")
+
+def test_parse_window_uppercase_unit():
+    """Test units are case-insensitive."""
+    assert _parse_window("2D").total_seconds() == 2 * 24 * 3600
 
 def test_healthcheck():
     """Test health check returns ok status."""
@@ -31,6 +39,15 @@ def test_healthcheck():
     assert "timestamp" in result
     assert "version" in result
 
+def test_embedding_indices_skip_low_confidence_and_short_posts():
+    """Test only confident, long enough posts are picked for embedding."""
+    def score(confidence):
+        return SentimentScore(polarity=0.0, subjectivity=0.5, sarcasm_prob=0.05, confidence=confidence)
+
+    texts = ["$AAPL strong earnings beat, raising targets", "$AAPL moon", "$AAPL trading sideways today"]
+    sentiments = [score(0.9), score(0.9), score(0.3)]
+    assert _embedding_indices(texts, sentiments) == [0]
+
 @patch("app.orchestration.tasks.resolve")
 @patch("app.orchestration.tasks.search_x_bundle")
 @patch("app.orchestration.tasks.search_reddit_bundle")
@@ -73,7 +90,7 @@ def test_aggregate_social_complete_pipeline(
     # Mock database
     mock_db_inst = MagicMock()
     mock_db.return_value = mock_db_inst
-    mock_db_inst.upsert_post.return_value = 1
+    mock_db_inst.upsert_posts_bulk.return_value = [1]
     mock_db_inst.aggregate.return_value = {
         "symbol": "AAPL",
         "posts_count": 1,
@@ -87,6 +104,107 @@ def test_aggregate_social_complete_pipeline(
     assert result is not None
     assert "symbol" in result
     assert "posts_processed" in result or "error" not in result
+    mock_db_inst.upsert_posts_bulk.assert_called_once()
+    mock_db_inst.upsert_sentiments_bulk.assert_called_once()
+    mock_db_inst.upsert_embeddings_bulk.assert_called_once()
+
+@patch("app.orchestration.tasks.resolve")
+@patch("app.orchestration.tasks.search_x_bundle")
+@patch("app.orchestration.tasks.search_reddit_bundle")
+@patch("app.orchestration.tasks.collect_stocktwits")
+@patch("app.orchestration.tasks.collect_discord")
+@patch("app.orchestration.tasks.DB")
+def test_aggregate_social_rolls_back_partial_writes(
+    mock_db, mock_discord, mock_st, mock_reddit, mock_x, mock_resolve
+):
+    """Test a failed sentiment upsert rolls back the posts and reports nothing processed."""
+    from app.services.types import SocialPost
+
+    mock_inst = MagicMock()
+    mock_inst.symbol = "AAPL"
+    mock_inst.model_dump.return_value = {"symbol": "AAPL", "company_name": "Apple Inc."}
+    mock_resolve.return_value = mock_inst
+    mock_x.return_value = [SocialPost(
+        source="x", platform_id="123", author_id="user1",
+        created_at=datetime.utcnow(), text="$AAPL looking bullish"
+    )]
+    mock_reddit.return_value = []
+    mock_st.return_value = []
+    mock_discord.return_value = []
+
+    mock_db_inst = mock_db.return_value
+    mock_db_inst.upsert_posts_bulk.return_value = [1]
+    mock_db_inst.upsert_sentiments_bulk.side_effect = RuntimeError("deadlock detected")
+    mock_db_inst.aggregate.return_value = {"symbol": "AAPL"}
+
+    result = aggregate_social("AAPL", "24h")
+
+    assert result["posts_processed"] == 0
+    mock_db_inst.upsert_embeddings_bulk.assert_not_called()
+    # The transaction saw the error, so the posts upsert was rolled back with it
+    exc_type = mock_db_inst.transaction.return_value.__exit__.call_args[0][0]
+    assert exc_type is RuntimeError
+
+@patch("app.orchestration.tasks.resolve")
+@patch("app.orchestration.tasks.search_x_bundle")
+@patch("app.orchestration.tasks.search_reddit_bundle")
+@patch("app.orchestration.tasks.collect_stocktwits")
+@patch("app.orchestration.tasks.collect_discord")
+@patch("app.orchestration.tasks._compute_embeddings", side_effect=RuntimeError("CUDA out of memory"))
+@patch("app.orchestration.tasks.DB")
+def test_aggregate_social_keeps_posts_when_embedding_fails(
+    mock_db, mock_embed, mock_discord, mock_st, mock_reddit, mock_x, mock_resolve
+):
+    """Test an embedding failure falls back to hash embeddings instead of dropping the posts."""
+    from app.services.types import SocialPost
+
+    mock_inst = MagicMock()
+    mock_inst.symbol = "AAPL"
+    mock_inst.model_dump.return_value = {"symbol": "AAPL", "company_name": "Apple Inc."}
+    mock_resolve.return_value = mock_inst
+    mock_x.return_value = [SocialPost(
+        source="x", platform_id="123", author_id="user1",
+        created_at=datetime.utcnow(), text="$AAPL strong earnings beat, raising targets"
+    )]
+    mock_reddit.return_value = []
+    mock_st.return_value = []
+    mock_discord.return_value = []
+
+    mock_db_inst = mock_db.return_value
+    mock_db_inst.upsert_posts_bulk.return_value = [1]
+    mock_db_inst.aggregate.return_value = {"symbol": "AAPL"}
+
+    with patch("app.orchestration.tasks._embedding_indices", return_value=[0]):
+        result = aggregate_social("AAPL", "24h")
+
+    assert result["posts_processed"] == 1
+    assert len(mock_db_inst.upsert_posts_bulk.call_args[0][0]) == 1
+    assert len(mock_db_inst.upsert_sentiments_bulk.call_args[0][0]) == 1
+    (pk, emb), = mock_db_inst.upsert_embeddings_bulk.call_args[0][0]
+    assert pk == 1
+    assert emb.shape == (384,)
+
+def test_db_transaction_shares_one_connection():
+    """Test writes inside DB.transaction() use one connection and roll back together."""
+    from app.storage.db import DB
+
+    pool = MagicMock()
+    conn = pool.connection.return_value.__enter__.return_value
+    cursor = conn.cursor.return_value.__enter__.return_value
+    cursor.fetchone.return_value = (1,)
+    cursor.nextset.return_value = None
+
+    with patch("app.storage.db.get_pool", return_value=pool):
+        db = DB()
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            db.upsert_posts_bulk([])
+            db.upsert_sentiments_bulk([])
+            raise RuntimeError("deadlock detected")
+
+    pool.connection.assert_called_once()
+    assert conn.transaction.return_value.__exit__.call_args[0][0] is RuntimeError
+    assert db._conn is None
 
 @patch("app.orchestration.tasks.resolve")
 def test_aggregate_social_symbol_not_found(mock_resolve):
@@ -171,3 +289,29 @@ def test_aggregate_social_partial_failure(
         except Exception:
             # Expected if DB mocking fails
             pass
+
+@patch("app.orchestration.tasks.resolve")
+@patch("app.orchestration.tasks.search_x_bundle")
+@patch("app.orchestration.tasks.search_reddit_bundle")
+@patch("app.orchestration.tasks.collect_stocktwits")
+@patch("app.orchestration.tasks.collect_discord")
+def test_aggregate_social_async_collects_all_sources(
+    mock_discord, mock_st, mock_reddit, mock_x, mock_resolve
+):
+    """Test async pipeline gathers every source and tolerates failures."""
+    mock_inst = MagicMock()
+    mock_inst.symbol = "AAPL"
+    mock_inst.model_dump.return_value = {"symbol": "AAPL", "company_name": "Apple Inc."}
+    mock_resolve.return_value = mock_inst
+
+    mock_x.return_value = []
+    mock_reddit.side_effect = Exception("API error")
+    mock_st.return_value = []
+    mock_discord.return_value = []
+
+    result = asyncio.run(aggregate_social_async("AAPL", "24h"))
+
+    assert result["posts_found"] == 0
+    assert result["sources"] == {"x": 0, "reddit": 0, "stocktwits": 0, "discord": 0}
+    for mock in (mock_x, mock_reddit, mock_st, mock_discord):
+        mock.assert_called_once()
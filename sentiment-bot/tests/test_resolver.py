@@ -1,4 +1,14 @@
+import pytest
+from unittest.mock import patch
+from app.services import resolver
 from app.services.resolver import resolve
+from app.services.types import ResolvedInstrument
+
+@pytest.fixture(autouse=True)
+def clear_resolver_cache():
+    resolver._local_cache.clear()
+    yield
+    resolver._local_cache.clear()
 
 def test_resolve_symbol():
     result = resolve("AAPL")
@@ -8,3 +18,47 @@ def test_resolve_symbol():
 def test_resolve_company_name():
     result = resolve("Apple")
     assert result.symbol == "AAPL"
+
+def test_resolve_caches_in_process():
+    with patch("app.services.resolver.DB") as mock_db, \
+         patch("app.services.resolver.cache_get", return_value=None), \
+         patch("app.services.resolver.cache_set") as mock_set:
+        mock_db.return_value.get_cached_resolution.return_value = None
+
+        first = resolve("MSFT")
+        second = resolve("msft")
+
+        assert first.symbol == second.symbol == "MSFT"
+        mock_db.assert_called_once()
+        mock_set.assert_called_once()
+
+def test_resolve_uses_redis_before_postgres():
+    cached = b'{"symbol": "TSLA", "company_name": "Tesla"}'
+    with patch("app.services.resolver.DB") as mock_db, \
+         patch("app.services.resolver.cache_get", return_value=cached):
+        result = resolve("TESLA")
+
+        assert result.symbol == "TSLA"
+        mock_db.assert_not_called()
+
+def test_resolve_serves_stale_while_refreshing():
+    stale = ResolvedInstrument(symbol="AAPL", company_name="Apple")
+    resolver._local_cache["AAPL"] = (0.0, stale)
+
+    with patch("app.services.resolver._schedule_refresh") as mock_refresh, \
+         patch("app.services.resolver._resolve_uncached") as mock_uncached:
+        assert resolve("aapl") is stale
+        mock_refresh.assert_called_once_with("aapl")
+        mock_uncached.assert_not_called()
+
+def test_resolve_refresh_replaces_stale_entry():
+    resolver._local_cache["AAPL"] = (0.0, ResolvedInstrument(symbol="AAPL", company_name="Old"))
+    fresh = ResolvedInstrument(symbol="AAPL", company_name="Apple")
+
+    with patch("app.services.resolver._resolve_uncached", return_value=fresh):
+        resolver._refresh("AAPL")
+
+    expires_at, result = resolver._local_cache["AAPL"]
+    assert result is fresh
+    assert expires_at > 0.0
+    assert not resolver._refreshing